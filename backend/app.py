@@ -1,11 +1,31 @@
 # backend/app.py
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, session
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, session, Response, stream_with_context, abort
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_cors import CORS
 from datetime import datetime, timedelta
 from config import config_map
-from models import db, User, Item, DeletedItem
-from auth import mail, generate_verification_code, send_verification_email
+from models import db, User, Item, DeletedItem, normalize
+from sqlalchemy import select, exists, func, case, and_
+from sqlalchemy.exc import IntegrityError
+from auth import mail, send_verification_email
+from page_cache import page_cache
+from page_styles import page_styles
+from replicas import replica_read, run_on_replica, remember_write, is_sticky
+from bulk_io import export_ndjson, export_csv, parse_ndjson, parse_csv, import_items
+from catalog import (seed_catalog, get_user_items, catalog_count, resolve_item,
+                     find_catalog_entry, migrate_all_users_to_catalog)
+from migrations import upgrade_schema
+from categories import categories, seed_categories
+from history import record_event, rollup_events, get_trends
+from suggestions import estimate_reorders, get_suggestions
+from rate_limit import limiter, pending_verification
+from mail_queue import dispatcher, prune_outbox
+from verification import verification_codes
+from operations import is_applied, mark_applied, prune_applied
+from single_flight import single_flight
+import fast_json
+import hashlib
+import hmac
 import os
 
 
@@ -48,6 +68,12 @@ def create_app(config_name=None):
 
     db.init_app(app)
     mail.init_app(app)
+    page_cache.init_app(app)
+    page_styles.init_app(app)
+    limiter.init_app(app)
+    verification_codes.init_app(app)
+    fast_json.init_app(app)
+    single_flight.init_app(app)
     CORS(app,
          supports_credentials=True,
          origins=["https://homeneeds.onrender.com"])
@@ -58,7 +84,7 @@ def create_app(config_name=None):
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return run_on_replica(User.query.get, int(user_id))
 
     @login_manager.unauthorized_handler
     def unauthorized():
@@ -67,7 +93,59 @@ def create_app(config_name=None):
         return redirect(url_for('login'))
 
     with app.app_context():
-        db.create_all()
+        # Replicas are read-only copies; their engines stay lazy so an
+        # unreachable replica only fails over at request time
+        db.create_all(bind_key=None)
+        # Categories first: upgrade_schema backfills category ids from them
+        seed_categories()
+        upgrade_schema()
+        seed_catalog()
+
+    dispatcher.init_app(app)
+    if app.config.get('MAIL_QUEUE_ENABLED'):
+        # Started by the first request, so `flask` CLI commands never send
+        app.before_request(dispatcher.start)
+
+    @app.cli.command('migrate-catalog')
+    def migrate_catalog_command():
+        """Move users' copied default items onto the shared catalog."""
+        count = migrate_all_users_to_catalog()
+        print(f"[MIGRATE] {count} users moved to the shared catalog")
+
+    @app.cli.command('rollup-events')
+    def rollup_events_command():
+        """Fold new item events into the daily rollups."""
+        count = rollup_events()
+        print(f"[ROLLUP] {count} events processed")
+
+    @app.cli.command('prune-operations')
+    def prune_operations_command():
+        """Forget old keys of replayed offline operations."""
+        count = prune_applied()
+        print(f"[OFFLINE] {count} operation keys pruned")
+
+    @app.cli.command('prune-mail')
+    def prune_mail_command():
+        """Delete old sent and failed messages from the outbox."""
+        count = prune_outbox()
+        print(f"[MAIL QUEUE] {count} messages pruned")
+
+    @app.cli.command('estimate-reorders')
+    def estimate_reorders_command():
+        """Recompute reorder-interval suggestions from procure history."""
+        count = estimate_reorders()
+        print(f"[SUGGEST] {count} suggestions written")
+
+    @app.cli.command('send-queued-mail')
+    def send_queued_mail_command():
+        """Drain the outbox once in the foreground."""
+        total = 0
+        while True:
+            sent = dispatcher.run_once()
+            if not sent:
+                break
+            total += sent
+        print(f"[MAIL QUEUE] {total} messages sent")
 
     # ============ HEALTH CHECK ============
     @app.route('/health')
@@ -76,7 +154,8 @@ def create_app(config_name=None):
             'status': 'healthy',
             'timestamp': datetime.utcnow().isoformat(),
             'template_folder': app.template_folder,
-            'static_folder': app.static_folder
+            'static_folder': app.static_folder,
+            'single_flight': single_flight.stats()
         })
 
     # ============ TEST MAIL ============
@@ -109,6 +188,7 @@ def create_app(config_name=None):
         return redirect(url_for('login'))
 
     @app.route('/login', methods=['GET', 'POST'])
+    @limiter.limit('login', 'login.html')
     def login():
         if current_user.is_authenticated:
             return redirect(url_for('dashboard'))
@@ -116,10 +196,12 @@ def create_app(config_name=None):
             data = request.get_json() if request.is_json else request.form
             name = data.get('name', '').strip()
             password = data.get('password', '')
-            user = User.query.filter_by(name=name).first()
-            if user and user.check_password(password):
-                # Auto-verify if not verified
+            user = find_login_user(name, password)
+            if user:
                 if not user.is_verified:
+                    if app.config.get('EMAIL_VERIFICATION_REQUIRED'):
+                        return start_verification(user)
+                    # Auto-verify if not verified
                     user.is_verified = True
                     db.session.commit()
 
@@ -132,7 +214,21 @@ def create_app(config_name=None):
             flash('Invalid name or password', 'error')
         return render_template('login.html')
 
+    def find_login_user(name, password):
+        user = User.query.filter_by(name_lower=normalize(name)).first()
+        if user is None or user.name != name:
+            # Legacy accounts that collided case-insensitively have no
+            # name_lower (see migrations.INDEX_PREPARES). Typing one's exact
+            # name must reach that account, never the one holding the key
+            legacy = User.query.filter(User.name_lower.is_(None), User.name == name).all()
+            if legacy:
+                return next((u for u in legacy if u.check_password(password)), None)
+        if user and user.check_password(password):
+            return user
+        return None
+
     @app.route('/signup', methods=['GET', 'POST'])
+    @limiter.limit('signup', 'signup.html')
     def signup():
         if current_user.is_authenticated:
             return redirect(url_for('dashboard'))
@@ -151,17 +247,11 @@ def create_app(config_name=None):
                 errors.append('Passwords do not match')
             if len(password) < 6:
                 errors.append('Password must be at least 6 characters')
-            if User.query.filter_by(email=email).first():
-                errors.append('Email already registered')
-            if User.query.filter_by(name=name).first():
-                errors.append('Username already taken')
+            if not errors:
+                errors = signup_conflicts(name, email)
 
             if errors:
-                msg = errors[0]
-                if request.is_json:
-                    return jsonify({'success': False, 'message': msg}), 400
-                flash(msg, 'error')
-                return render_template('signup.html')
+                return signup_error(errors[0])
 
             user = User(name=name, email=email)
             if dob:
@@ -172,40 +262,100 @@ def create_app(config_name=None):
             user.set_password(password)
 
             # Auto-verify — no email on Render free tier
-            user.is_verified = True
+            user.is_verified = not app.config.get('EMAIL_VERIFICATION_REQUIRED')
 
             db.session.add(user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Lost a race with a concurrent signup; the unique indexes
+                # on name_lower and email_lower caught it
+                db.session.rollback()
+                errors = signup_conflicts(name, email)
+                return signup_error(errors[0] if errors else 'Username or email already taken')
+
+            if not user.is_verified:
+                print(f"[SIGNUP] User created, awaiting verification: {name}")
+                return start_verification(user)
 
             print(f"[SIGNUP] User created and auto-verified: {name}")
 
             login_user(user, remember=True)
-            add_default_items(user.id)
 
             if request.is_json:
                 return jsonify({'success': True, 'redirect': url_for('dashboard')})
             return redirect(url_for('dashboard'))
         return render_template('signup.html')
 
+    def signup_conflicts(name, email):
+        email_taken, name_taken = db.session.execute(select(
+            exists().where(User.email_lower == normalize(email)),
+            exists().where(User.name_lower == normalize(name)),
+        )).one()
+        errors = []
+        if email_taken:
+            errors.append('Email already registered')
+        if name_taken:
+            errors.append('Username already taken')
+        return errors
+
+    def signup_error(msg):
+        if request.is_json:
+            return jsonify({'success': False, 'message': msg}), 400
+        flash(msg, 'error')
+        return render_template('signup.html')
+
+    def start_verification(user):
+        session['verify_user_id'] = user.id
+        code = verification_codes.issue(user.id)
+        send_verification_email(user.email, code)
+        if request.is_json:
+            return jsonify({'success': True, 'redirect': url_for('verify')})
+        return redirect(url_for('verify'))
+
     @app.route('/verify', methods=['GET', 'POST'])
+    @limiter.limit('verify', 'verify.html', user_key=pending_verification)
     def verify():
-        # If someone lands here, just redirect to dashboard or login
         if current_user.is_authenticated:
             return redirect(url_for('dashboard'))
-        return redirect(url_for('login'))
+        user_id = session.get('verify_user_id')
+        user = db.session.get(User, user_id) if user_id else None
+        if not user:
+            # If someone lands here without a pending signup, send them to login
+            if request.method == 'POST':
+                return jsonify({'success': False, 'message': 'Session expired'}), 400
+            return redirect(url_for('login'))
+
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or request.form
+            code = str(data.get('code', '')).strip()
+            if not verification_codes.check(user.id, code):
+                return jsonify({'success': False, 'message': 'Invalid or expired code'}), 400
+            user.is_verified = True
+            db.session.commit()
+            login_user(user, remember=True)
+            session.pop('verify_user_id', None)
+            return jsonify({'success': True, 'redirect': url_for('dashboard')})
 
+        return render_template('verify.html', email=user.email)
+
+    # Each resend issues a fresh code with fresh attempts, so it is limited
+    # as tightly as the codes themselves
     @app.route('/resend-code', methods=['POST'])
+    @limiter.limit('resend', 'verify.html', user_key=pending_verification)
     def resend_code():
-        # Auto-verify and redirect
         user_id = session.get('verify_user_id')
         if user_id:
             user = User.query.get(user_id)
+            if user and app.config.get('EMAIL_VERIFICATION_REQUIRED'):
+                code = verification_codes.issue(user.id)
+                send_verification_email(user.email, code)
+                return jsonify({'success': True, 'message': 'New code sent!'})
             if user:
+                # Auto-verify and redirect
                 user.is_verified = True
                 db.session.commit()
                 login_user(user, remember=True)
-                if not Item.query.filter_by(user_id=user.id).first():
-                    add_default_items(user.id)
                 session.pop('verify_user_id', None)
                 return jsonify({
                     'success': True,
@@ -220,72 +370,41 @@ def create_app(config_name=None):
         logout_user()
         return redirect(url_for('login'))
 
-    def add_default_items(user_id):
-        if Item.query.filter_by(user_id=user_id).first():
-            return
-        default_veg = [
-            'Tomato', 'Potato', 'Onion', 'Carrot', 'Spinach', 'Broccoli',
-            'Capsicum', 'Cucumber', 'Cabbage', 'Cauliflower', 'Green Beans',
-            'Peas', 'Corn', 'Lettuce', 'Mushroom', 'Garlic', 'Ginger',
-            'Apple', 'Banana', 'Orange', 'Mango', 'Grapes', 'Watermelon',
-            'Strawberry', 'Pineapple', 'Papaya', 'Lemon', 'Pomegranate',
-            'Guava', 'Kiwi'
-        ]
-        default_grocery = [
-            'Rice', 'Wheat Flour', 'Sugar', 'Salt', 'Cooking Oil', 'Butter',
-            'Milk', 'Bread', 'Eggs', 'Tea', 'Coffee', 'Pasta', 'Noodles',
-            'Oats', 'Cornflakes', 'Biscuits', 'Jam', 'Honey', 'Ketchup',
-            'Soy Sauce', 'Vinegar', 'Pepper', 'Turmeric', 'Cumin',
-            'Coriander Powder', 'Chili Powder', 'Cinnamon', 'Cardamom',
-            'Dal / Lentils', 'Chickpeas'
-        ]
-        for name in default_veg:
-            db.session.add(
-                Item(name=name, category='vegfruit', user_id=user_id))
-        for name in default_grocery:
-            db.session.add(
-                Item(name=name, category='grocery', user_id=user_id))
-        db.session.commit()
-
     # ============ PAGE ROUTES ============
 
     @app.route('/dashboard')
     @login_required
     def dashboard():
-        stats = get_user_stats(current_user.id)
+        stats = get_user_stats(current_user)
         return render_template('dashboard.html', user=current_user, **stats)
 
-    @app.route('/vegfruits-procure')
-    @login_required
-    def vegfruits_procure():
-        return render_template('vegfruits_procure.html')
-
-    @app.route('/groceries-procure')
+    # /vegfruits-procure, /groceries-list, ...: one page pair per category
+    @app.route('/<page>-procure')
     @login_required
-    def groceries_procure():
-        return render_template('groceries_procure.html')
+    def procure_page(page):
+        category = categories.get_by_page(page)
+        if category is None:
+            abort(404)
+        return page_cache.serve(f'{category.page}_procure.html')
 
-    @app.route('/vegfruits-list')
+    @app.route('/<page>-list')
     @login_required
-    def vegfruits_list():
-        return render_template('vegfruits_list.html')
-
-    @app.route('/groceries-list')
-    @login_required
-    def groceries_list():
-        return render_template('groceries_list.html')
+    def list_page(page):
+        category = categories.get_by_page(page)
+        if category is None:
+            abort(404)
+        return page_cache.serve(f'{category.page}_list.html')
 
     # ============ API ROUTES ============
 
     @app.route('/api/items/<category>', methods=['GET'])
     @login_required
+    @replica_read
     def get_items(category):
-        if category not in ['vegfruit', 'grocery']:
+        if categories.get(category) is None:
             return jsonify({'success': False, 'message': 'Invalid category'}), 400
-        items = Item.query.filter_by(
-            user_id=current_user.id, category=category
-        ).order_by(Item.name).all()
-        return jsonify([item.to_dict() for item in items])
+        return cacheable_json(('items', category),
+                              lambda: get_user_items(current_user, category))
 
     @app.route('/api/items', methods=['POST'])
     @login_required
@@ -293,62 +412,139 @@ def create_app(config_name=None):
         data = request.get_json()
         if not data:
             return jsonify({'success': False, 'message': 'No data provided'}), 400
-        name = data.get('name', '').strip()
-        category = data.get('category', '').strip()
+        item, error = create_item(data.get('name', ''), data.get('category', ''))
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        db.session.commit()
+        return jsonify({'success': True, 'item': item.to_dict()}), 201
+
+    def create_item(name, category):
+        """Add an item for the current user; returns (item, error message)"""
+        name = name.strip() if isinstance(name, str) else ''
+        category = category.strip() if isinstance(category, str) else ''
         if not name or len(name) > 100:
-            return jsonify({'success': False, 'message': 'Invalid item name'}), 400
-        if category not in ['vegfruit', 'grocery']:
-            return jsonify({'success': False, 'message': 'Invalid category'}), 400
+            return None, 'Invalid item name'
+        if categories.get(category) is None:
+            return None, 'Invalid category'
         existing = Item.query.filter_by(
-            user_id=current_user.id, name=name, category=category
+            user_id=current_user.id, name=name, category=category, hidden=False
         ).first()
         if existing:
-            return jsonify({'success': False, 'message': 'Item already exists'}), 400
-        item = Item(name=name, category=category, user_id=current_user.id)
-        db.session.add(item)
-        db.session.commit()
-        return jsonify({'success': True, 'item': item.to_dict()}), 201
+            return None, 'Item already exists'
+        entry = find_catalog_entry(category, name) if current_user.uses_catalog else None
+        if entry:
+            item = Item.query.filter_by(
+                user_id=current_user.id, catalog_id=entry.id).first()
+            if not item:
+                return None, 'Item already exists'
+            # Re-adding a catalog item the user had removed
+            item.hidden = False
+            item.to_procure = False
+            item.consumed = False
+        else:
+            item = Item(name=name, category=category, user_id=current_user.id)
+            db.session.add(item)
+        return item, None
 
-    @app.route('/api/items/<int:item_id>/toggle-procure', methods=['PUT'])
+    @app.route('/api/items/<int(signed=True):item_id>/toggle-procure', methods=['PUT'])
     @login_required
     def toggle_procure(item_id):
-        item = Item.query.filter_by(
-            id=item_id, user_id=current_user.id).first()
+        item = resolve_item(current_user, item_id)
         if not item:
             return jsonify({'success': False, 'message': 'Item not found'}), 404
         item.to_procure = not item.to_procure
         if not item.to_procure:
             item.consumed = False
+        record_event(item, 'procured' if item.to_procure else 'unprocured')
         db.session.commit()
         return jsonify({'success': True, 'item': item.to_dict()})
 
-    @app.route('/api/items/<int:item_id>/toggle-consumed', methods=['PUT'])
+    @app.route('/api/items/<int(signed=True):item_id>/toggle-consumed', methods=['PUT'])
     @login_required
     def toggle_consumed(item_id):
-        item = Item.query.filter_by(
-            id=item_id, user_id=current_user.id).first()
+        item = resolve_item(current_user, item_id)
         if not item:
             return jsonify({'success': False, 'message': 'Item not found'}), 404
         item.consumed = not item.consumed
+        record_event(item, 'consumed' if item.consumed else 'unconsumed')
         db.session.commit()
         return jsonify({'success': True, 'item': item.to_dict()})
 
-    @app.route('/api/items/<int:item_id>', methods=['DELETE'])
+    @app.route('/api/items/state', methods=['PUT'])
+    @login_required
+    def set_items_state():
+        """
+        Set explicit state for several items in one request.
+        Body: {"items": [{"id": 5, "to_procure": true, "consumed": false}, ...]}
+        Replaying the same body leaves the items unchanged, unlike the toggles.
+        """
+        data = request.get_json(silent=True) or {}
+        changes = data.get('items')
+        if not isinstance(changes, list) or not changes:
+            return jsonify({'success': False, 'message': 'No items given'}), 400
+        if len(changes) > app.config['ITEM_STATE_BATCH_MAX']:
+            return jsonify({'success': False, 'message': 'Too many items'}), 400
+
+        items, missing = {}, []
+        for change in changes:
+            change = change if isinstance(change, dict) else {}
+            item_id = change.get('id')
+            to_procure = change.get('to_procure')
+            consumed = change.get('consumed', False)
+            if (type(item_id) is not int or not isinstance(to_procure, bool)
+                    or not isinstance(consumed, bool)):
+                db.session.rollback()
+                return jsonify({'success': False, 'message': 'Invalid item state'}), 400
+            item = resolve_item(current_user, item_id)
+            if not item:
+                missing.append(item_id)
+                continue
+            apply_item_state(item, to_procure, consumed)
+            items[str(item_id)] = item
+        db.session.commit()
+        return jsonify({
+            'success': True,
+            'items': {key: item.to_dict() for key, item in items.items()},
+            'missing': missing,
+        })
+
+    def apply_item_state(item, to_procure, consumed):
+        # Same rules and history events as the toggle routes
+        consumed = consumed and to_procure
+        if item.to_procure != to_procure:
+            item.to_procure = to_procure
+            record_event(item, 'procured' if to_procure else 'unprocured')
+        if item.consumed != consumed:
+            item.consumed = consumed
+            if to_procure:
+                record_event(item, 'consumed' if consumed else 'unconsumed')
+
+    @app.route('/api/items/<int(signed=True):item_id>', methods=['DELETE'])
     @login_required
     def delete_item(item_id):
-        item = Item.query.filter_by(
-            id=item_id, user_id=current_user.id).first()
+        item = resolve_item(current_user, item_id)
         if not item:
             return jsonify({'success': False, 'message': 'Item not found'}), 404
+        deleted = remove_item(item)
+        db.session.commit()
+        return jsonify({'success': True, 'deleted_id': deleted.id, 'item_name': deleted.name})
+
+    def remove_item(item):
+        """Delete item, keeping a DeletedItem for undo"""
         deleted = DeletedItem(
             original_id=item.id, name=item.name, category=item.category,
             is_active=item.is_active, to_procure=item.to_procure,
-            consumed=item.consumed, user_id=item.user_id
+            consumed=item.consumed, user_id=item.user_id,
+            catalog_id=item.catalog_id
         )
         db.session.add(deleted)
-        db.session.delete(item)
-        db.session.commit()
-        return jsonify({'success': True, 'deleted_id': deleted.id, 'item_name': deleted.name})
+        record_event(item, 'deleted')
+        if item.catalog_id:
+            # Keep the override so the catalog entry stays hidden
+            item.hidden = True
+        else:
+            db.session.delete(item)
+        return deleted
 
     @app.route('/api/items/undo/<int:deleted_id>', methods=['POST'])
     @login_required
@@ -358,38 +554,215 @@ def create_app(config_name=None):
         ).first()
         if not deleted:
             return jsonify({'success': False, 'message': 'Cannot undo'}), 404
-        item = Item(
-            name=deleted.name, category=deleted.category,
-            is_active=deleted.is_active, to_procure=deleted.to_procure,
-            consumed=deleted.consumed, user_id=deleted.user_id
-        )
-        db.session.add(item)
+        item = None
+        if deleted.catalog_id:
+            item = Item.query.filter_by(
+                user_id=deleted.user_id, catalog_id=deleted.catalog_id).first()
+        if item:
+            item.hidden = False
+            item.is_active = deleted.is_active
+            item.to_procure = deleted.to_procure
+            item.consumed = deleted.consumed
+        else:
+            item = Item(
+                name=deleted.name, category=deleted.category,
+                is_active=deleted.is_active, to_procure=deleted.to_procure,
+                consumed=deleted.consumed, user_id=deleted.user_id,
+                catalog_id=deleted.catalog_id
+            )
+            db.session.add(item)
         db.session.delete(deleted)
         db.session.commit()
         return jsonify({'success': True, 'item': item.to_dict()})
 
+    # ============ OFFLINE REPLAY ============
+
+    @app.route('/api/batch', methods=['POST'])
+    @login_required
+    def apply_batch():
+        """
+        Apply operations the service worker queued while offline, in order.
+        Body: {"user_key": "...", "ops": [{"key": "<unique>", "op": "add", ...}]}
+        Ops: add {name, category}, state {id, to_procure, consumed}, delete {id}.
+        An op whose key was applied before is skipped as a duplicate, so a
+        batch can be resent safely when its response was lost.
+        """
+        data = request.get_json(silent=True) or {}
+        ops = data.get('ops')
+        if not isinstance(ops, list) or not ops:
+            return jsonify({'success': False, 'message': 'No operations given'}), 400
+        if len(ops) > app.config['BATCH_MAX_OPS']:
+            return jsonify({'success': False, 'message': 'Too many operations'}), 400
+        # Queued under another account on this device
+        if data.get('user_key') != user_cache_key(current_user):
+            return jsonify({'success': False, 'message': 'Operations belong to another user'}), 403
+
+        results, seen = [], set()
+        for op in ops:
+            op = op if isinstance(op, dict) else {}
+            key = op.get('key')
+            if not isinstance(key, str) or not 0 < len(key) <= 64:
+                results.append({'key': key, 'status': 'error', 'message': 'Invalid key'})
+                continue
+            if key in seen or is_applied(current_user.id, key):
+                results.append({'key': key, 'status': 'duplicate'})
+                continue
+            seen.add(key)
+            result = apply_operation(op)
+            result['key'] = key
+            if result['status'] == 'applied':
+                mark_applied(current_user.id, key)
+            results.append(result)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # The same batch is being applied by a concurrent request
+            db.session.rollback()
+            return jsonify({'success': False, 'message': 'Batch already in progress'}), 409
+        return jsonify({'success': True, 'results': results})
+
+    def apply_operation(op):
+        kind = op.get('op')
+        if kind == 'add':
+            item, error = create_item(op.get('name'), op.get('category'))
+            if error:
+                return {'status': 'error', 'message': error}
+            db.session.flush()
+            return {'status': 'applied', 'item': item.to_dict()}
+
+        item_id = op.get('id')
+        if kind not in ('state', 'delete') or type(item_id) is not int:
+            return {'status': 'error', 'message': 'Invalid operation'}
+        to_procure, consumed = op.get('to_procure'), op.get('consumed', False)
+        if kind == 'state' and not (isinstance(to_procure, bool) and isinstance(consumed, bool)):
+            return {'status': 'error', 'message': 'Invalid item state'}
+        item = resolve_item(current_user, item_id)
+        if not item:
+            return {'status': 'error', 'message': 'Item not found'}
+        if kind == 'delete':
+            remove_item(item)
+            return {'status': 'applied'}
+        apply_item_state(item, to_procure, consumed)
+        return {'status': 'applied', 'item': item.to_dict()}
+
+    # ============ BULK EXPORT / IMPORT ============
+
+    bulk_formats = {
+        'ndjson': (export_ndjson, parse_ndjson, 'application/x-ndjson'),
+        'csv': (export_csv, parse_csv, 'text/csv'),
+    }
+
+    @app.route('/api/export/items.<fmt>', methods=['GET'])
+    @login_required
+    def export_items(fmt):
+        if fmt not in bulk_formats:
+            return jsonify({'success': False, 'message': 'Invalid format'}), 400
+        category = request.args.get('category')
+        if category and categories.get(category) is None:
+            return jsonify({'success': False, 'message': 'Invalid category'}), 400
+        exporter, _, mimetype = bulk_formats[fmt]
+        response = Response(
+            stream_with_context(exporter(current_user, category)),
+            mimetype=mimetype)
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=home-needs-items.{fmt}')
+        return response
+
+    @app.route('/api/import/items.<fmt>', methods=['POST'])
+    @login_required
+    def import_items_route(fmt):
+        if fmt not in bulk_formats:
+            return jsonify({'success': False, 'message': 'Invalid format'}), 400
+        _, parser, _ = bulk_formats[fmt]
+        # Multipart upload or raw request body, read as a stream either way
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        stats = import_items(current_user, parser(stream))
+        return jsonify({'success': True, **stats})
+
     @app.route('/api/dashboard-stats', methods=['GET'])
     @login_required
+    @replica_read
     def dashboard_stats():
-        return jsonify(get_user_stats(current_user.id))
-
-    def get_user_stats(user_id):
-        return {
-            'veg_procure_count': Item.query.filter_by(
-                user_id=user_id, category='vegfruit', to_procure=True, consumed=False
-            ).count(),
-            'grocery_procure_count': Item.query.filter_by(
-                user_id=user_id, category='grocery', to_procure=True, consumed=False
-            ).count(),
-            'total_veg': Item.query.filter_by(user_id=user_id, category='vegfruit').count(),
-            'total_grocery': Item.query.filter_by(user_id=user_id, category='grocery').count(),
-            'consumed_veg': Item.query.filter_by(
-                user_id=user_id, category='vegfruit', consumed=True
-            ).count(),
-            'consumed_grocery': Item.query.filter_by(
-                user_id=user_id, category='grocery', consumed=True
-            ).count(),
-        }
+        return cacheable_json(('stats',), lambda: get_user_stats(current_user))
+
+    @app.route('/api/dashboard-trends', methods=['GET'])
+    @login_required
+    @replica_read
+    def dashboard_trends():
+        days = request.args.get('days', 14, type=int)
+        return jsonify(get_trends(current_user.id, days))
+
+    @app.route('/api/suggestions', methods=['GET'])
+    @login_required
+    @replica_read
+    def suggestions():
+        return jsonify(get_suggestions(current_user.id))
+
+    def cacheable_json(key, build):
+        """
+        JSON read the service worker may cache: tagged with an ETag (304
+        when the client's copy is current) and with a per-user cache key.
+        Concurrent identical reads by the same user share one build() and
+        one serialized body; each request still gets its own response.
+        """
+        body, etag = single_flight.do(current_user.id, (is_sticky(),) + key,
+                                      lambda: serialize_json(build()))
+        response = app.response_class(body, mimetype=app.json.mimetype)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['X-User-Key'] = user_cache_key(current_user)
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def serialize_json(data):
+        response = jsonify(data)
+        response.add_etag()
+        return response.get_data(), response.get_etag()[0]
+
+    def user_cache_key(user):
+        # Opaque, so cache names never reveal user ids
+        message = f'user:{user.id}'.encode('utf-8')
+        key = app.config['SECRET_KEY'].encode('utf-8')
+        return hmac.new(key, message, hashlib.sha256).hexdigest()[:16]
+
+    def get_user_stats(user):
+        """
+        Dashboard counts for every category from one grouped query.
+        Catalog entries without an override are never procured or consumed,
+        so only the totals need to account for them.
+        """
+        visible = Item.hidden.is_(False)
+        rows = db.session.execute(
+            select(
+                Item.category_id,
+                func.sum(case((visible, 1), else_=0)),
+                func.sum(case((Item.catalog_id.isnot(None), 1), else_=0)),
+                func.sum(case((and_(visible, Item.to_procure, ~Item.consumed), 1), else_=0)),
+                func.sum(case((and_(visible, Item.consumed), 1), else_=0)),
+            ).where(Item.user_id == user.id).group_by(Item.category_id)
+        ).all()
+        counts = {row[0]: row[1:] for row in rows}
+
+        category_stats = {}
+        for category in categories.all():
+            own, overrides, procure, consumed = counts.get(category.id, (0, 0, 0, 0))
+            total = own
+            if user.uses_catalog:
+                total += catalog_count(category.slug) - overrides
+            category_stats[category.slug] = {
+                'label': category.label, 'procure': procure,
+                'total': total, 'consumed': consumed,
+            }
+
+        # Flat names the dashboard template and API already use
+        stats = {'category_stats': category_stats}
+        for slug, prefix in (('vegfruit', 'veg'), ('grocery', 'grocery')):
+            entry = category_stats.get(slug, {'procure': 0, 'total': 0, 'consumed': 0})
+            stats[f'{prefix}_procure_count'] = entry['procure']
+            stats[f'total_{prefix}'] = entry['total']
+            stats[f'consumed_{prefix}'] = entry['consumed']
+        return stats
 
     # ============ ASSET LINKS ============
 
@@ -420,6 +793,20 @@ def create_app(config_name=None):
             return jsonify({'success': False, 'message': 'Server error'}), 500
         return redirect(url_for('dashboard'))
 
+    # ============ REPLICA STICKINESS ============
+
+    app.after_request(remember_write)
+
+    # ============ SINGLE-FLIGHT READS ============
+
+    @app.after_request
+    def bump_data_version(response):
+        # Reads after this write must not join a flight that started before it
+        if request.method not in ('GET', 'HEAD') and response.status_code < 400:
+            if current_user.is_authenticated:
+                single_flight.bump(current_user.id)
+        return response
+
     # ============ SECURITY HEADERS ============
 
     @app.after_request
@@ -428,10 +815,13 @@ def create_app(config_name=None):
         response.headers['X-Frame-Options'] = 'DENY'
         response.headers['Referrer-Policy'] = 'no-referrer-when-downgrade'
 
-        # Content Security Policy
+        # Content Security Policy; pages also allow their inline critical CSS
+        style_src = "'self' https://fonts.googleapis.com https://cdnjs.cloudflare.com"
+        if response.mimetype == 'text/html':
+            style_src = f"{style_src} {page_styles.csp_sources()}".rstrip()
         response.headers['Content-Security-Policy'] = (
             "default-src 'self'; "
-            "style-src 'self' https://fonts.googleapis.com https://cdnjs.cloudflare.com; "
+            f"style-src {style_src}; "
             "font-src 'self' https://fonts.gstatic.com; "
             "script-src 'self'; "
             "img-src 'self' data:; "
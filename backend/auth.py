@@ -1,25 +1,44 @@
 # backend/auth.py
-import random
+import secrets
 import string
 import os
 
+from flask import current_app
 from flask_mail import Mail
 
-mail = Mail()
+from mail_queue import enqueue_mail
 
-last_codes = {}
+mail = Mail()
 
 
 def generate_verification_code():
-    return ''.join(random.choices(string.digits, k=6))
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+
+def describe_ttl(seconds):
+    """'10 minutes', '1 hour', '90 seconds'"""
+    for unit, size in (('hour', 3600), ('minute', 60)):
+        if seconds >= size and seconds % size == 0:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{seconds} second{'s' if seconds != 1 else ''}"
 
 
 def send_verification_email(user_email, code):
     """
-    Email is not available on Render free tier.
-    Just log the code and return False so app auto-verifies.
+    Queue the code for the background mail dispatcher when it is enabled.
+    Email is not available on Render free tier, so otherwise
+    just log the code and return False so app auto-verifies.
     """
-    last_codes[user_email] = code
+    if current_app.config.get('MAIL_QUEUE_ENABLED'):
+        ttl = current_app.config.get('VERIFICATION_CODE_TTL', 600)
+        enqueue_mail(
+            user_email,
+            'Your Home Needs verification code',
+            f"Your Home Needs verification code is {code}.\n"
+            f"It expires in {describe_ttl(ttl)}."
+        )
+        return True
     print(f"[EMAIL] Code for {user_email}: {code}")
     print(f"[EMAIL] SMTP not available — user will be auto-verified")
     return False
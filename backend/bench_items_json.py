@@ -0,0 +1,109 @@
+# backend/bench_items_json.py
+# Run: python bench_items_json.py [item_count ...]
+#
+# Measures building the /api/items/<category> body for one user: the old
+# path (ORM Items, to_dict(), Flask's stdlib jsonify) against the lean
+# path (column tuples, fast_json backend). Reports median CPU time and
+# peak traced allocation per request. Uses a throwaway SQLite file.
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+
+import fast_json
+from categories import categories, seed_categories
+from catalog import get_user_items
+from models import db, User, Item
+
+REQUESTS = 30
+CATEGORY = 'grocery'
+
+
+def build_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed_user(count):
+    # uses_catalog=False, so the list is exactly the user's own rows
+    user = User(name='bench', email='bench@example.com', uses_catalog=False)
+    user.password_hash = '-'
+    db.session.add(user)
+    db.session.commit()
+    category_id = categories.id_for(CATEGORY)
+    db.session.execute(insert(Item), [
+        {'name': f'Item {i:05d}', 'category_id': category_id, 'user_id': user.id,
+         'to_procure': i % 3 == 0, 'consumed': i % 9 == 0}
+        for i in range(count)
+    ])
+    db.session.commit()
+    return user
+
+
+def measure(build):
+    cpu = []
+    for _ in range(REQUESTS):
+        db.session.expunge_all()
+        start = time.process_time()
+        build()
+        cpu.append((time.process_time() - start) * 1000)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(cpu), peak / 1024
+
+
+def run(count):
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = build_app(db_path)
+    stdlib = DefaultJSONProvider(app)
+    backend, dumps = fast_json.get_backend('auto')
+
+    try:
+        with app.app_context():
+            db.create_all()
+            seed_categories()
+            user = seed_user(count)
+
+            def old_path():
+                items = Item.query.filter_by(
+                    user_id=user.id, category=CATEGORY, hidden=False
+                ).order_by(Item.name).all()
+                return stdlib.dumps([item.to_dict() for item in items]).encode('utf-8')
+
+            def new_path():
+                return dumps(get_user_items(user, CATEGORY))
+
+            assert len(old_path()) > 0 and len(new_path()) > 0
+            return backend, measure(old_path), measure(new_path)
+    finally:
+        os.remove(db_path)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [60, 1000, 10000]
+    print(f"\n  {'items':>6s} {'path':28s} {'cpu ms':>9s} {'peak KiB':>10s}")
+    for count in counts:
+        backend, old, new = run(count)
+        for label, (cpu, peak) in (
+                ('ORM + to_dict + stdlib', old),
+                (f'columns + {backend}', new)):
+            print(f"  {count:6d} {label:28s} {cpu:9.2f} {peak:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# backend/bench_login.py
+# Run: python bench_login.py [user_count]
+#
+# Measures the user lookup done by /login at 100k+ users: the old
+# unindexed filter on User.name against the indexed User.name_lower.
+# Uses a throwaway SQLite file; the password hash is computed once.
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import insert
+
+from models import db, User, normalize
+
+LOOKUPS = 500
+
+
+def build_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed_users(count):
+    probe = User(name='probe', email='probe@example.com')
+    probe.set_password('secret1')
+    password_hash = probe.password_hash
+
+    batch = []
+    for i in range(count):
+        name = f'User{i:07d}'
+        email = f'user{i:07d}@example.com'
+        batch.append({
+            'name': name, 'name_lower': normalize(name),
+            'email': email, 'email_lower': normalize(email),
+            'password_hash': password_hash, 'is_verified': True,
+        })
+        if len(batch) == 10000:
+            db.session.execute(insert(User), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(User), batch)
+    db.session.commit()
+
+
+def time_lookups(lookup, names):
+    timings = []
+    for name in names:
+        start = time.perf_counter()
+        lookup(name)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = build_app(db_path)
+
+    try:
+        with app.app_context():
+            db.create_all()
+            print(f"Seeding {count} users...")
+            seed_users(count)
+
+            names = [f'User{random.randrange(count):07d}' for _ in range(LOOKUPS)]
+
+            def old_lookup(name):
+                User.query.filter_by(name=name).first()
+                db.session.expunge_all()
+
+            def new_lookup(name):
+                User.query.filter_by(name_lower=normalize(name)).first()
+                db.session.expunge_all()
+
+            old_p50, old_p95 = time_lookups(old_lookup, names)
+            new_p50, new_p95 = time_lookups(new_lookup, [n.upper() for n in names])
+
+            user = User.query.filter_by(name_lower=normalize(names[0])).first()
+            start = time.perf_counter()
+            user.check_password('secret1')
+            hash_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n  Users: {count}, lookups: {LOOKUPS}")
+        print(f"  {'':28s} {'p50 ms':>10s} {'p95 ms':>10s}")
+        print(f"  {'name (unindexed scan)':28s} {old_p50:10.3f} {old_p95:10.3f}")
+        print(f"  {'name_lower (indexed)':28s} {new_p50:10.3f} {new_p95:10.3f}")
+        print(f"  {'password check (once)':28s} {hash_ms:10.1f}")
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
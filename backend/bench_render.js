@@ -0,0 +1,304 @@
+// backend/bench_render.js
+// Run: node bench_render.js [item_count ...]
+//
+// Times list rendering without a browser. app.js is loaded into a small
+// DOM shim whose innerHTML getter serializes and whose setter re-parses,
+// like a real browser, so the old `itemsList.innerHTML += ...` loop shows
+// its quadratic cost next to the batched and virtualized renderers.
+// Layout is not simulated: every row reports the same height.
+
+var fs = require('fs');
+var path = require('path');
+var vm = require('vm');
+
+var ROW_HEIGHT = 56;
+// The old loop is quadratic; above this size its time is extrapolated
+var LEGACY_MAX_ITEMS = 1000;
+var VIEWPORT_HEIGHT = 800;
+
+// ============================================
+// DOM SHIM
+// ============================================
+var VOID_TAGS = { input: true, br: true, img: true, hr: true };
+
+function Node() {
+    this.parentNode = null;
+    this.childNodes = [];
+}
+
+Node.prototype.appendChild = function(child) {
+    return this.insertBefore(child, null);
+};
+
+Node.prototype.insertBefore = function(child, ref) {
+    var nodes = child.isFragment ? child.childNodes.splice(0) : [child];
+    var self = this;
+    nodes.forEach(function(node) {
+        if (node.parentNode) node.remove();
+        node.parentNode = self;
+    });
+    var index = ref ? this.childNodes.indexOf(ref) : this.childNodes.length;
+    Array.prototype.splice.apply(this.childNodes, [index, 0].concat(nodes));
+    return child;
+};
+
+Node.prototype.remove = function() {
+    if (!this.parentNode) return;
+    var siblings = this.parentNode.childNodes;
+    siblings.splice(siblings.indexOf(this), 1);
+    this.parentNode = null;
+};
+
+function TextNode(text) {
+    Node.call(this);
+    this.text = text;
+}
+TextNode.prototype = Object.create(Node.prototype);
+TextNode.prototype.serialize = function() {
+    return this.text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+};
+
+function Fragment() {
+    Node.call(this);
+    this.isFragment = true;
+}
+Fragment.prototype = Object.create(Node.prototype);
+Object.defineProperty(Fragment.prototype, 'firstElementChild', {
+    get: function() { return this.childNodes.filter(isElement)[0] || null; }
+});
+
+function isElement(node) {
+    return node instanceof Element;
+}
+
+function Element(tag) {
+    Node.call(this);
+    var self = this;
+    this.tagName = tag.toUpperCase();
+    this.attributes = {};
+    this.style = {};
+    this.offsetHeight = ROW_HEIGHT;
+    this.classList = {
+        add: function(name) { self.setClass(self.classes().concat([name])); },
+        remove: function(name) {
+            self.setClass(self.classes().filter(function(c) { return c !== name; }));
+        },
+        contains: function(name) { return self.classes().indexOf(name) !== -1; }
+    };
+    if (this.tagName === 'TEMPLATE') this.content = new Fragment();
+}
+Element.prototype = Object.create(Node.prototype);
+
+Element.prototype.classes = function() {
+    return (this.attributes['class'] || '').split(/\s+/).filter(Boolean);
+};
+Element.prototype.setClass = function(list) {
+    this.attributes['class'] = list.join(' ');
+};
+Element.prototype.setAttribute = function(name, value) {
+    this.attributes[name] = String(value);
+};
+Element.prototype.getAttribute = function(name) {
+    return name in this.attributes ? this.attributes[name] : null;
+};
+Element.prototype.addEventListener = function() {};
+Element.prototype.getBoundingClientRect = function() {
+    return { top: 0, left: 0, width: 400, height: ROW_HEIGHT };
+};
+Element.prototype.querySelector = function() { return null; };
+Element.prototype.querySelectorAll = function() { return []; };
+
+Object.defineProperty(Element.prototype, 'className', {
+    get: function() { return this.attributes['class'] || ''; },
+    set: function(value) { this.attributes['class'] = value; }
+});
+
+Object.defineProperty(Element.prototype, 'children', {
+    get: function() { return this.childNodes.filter(isElement); }
+});
+
+Object.defineProperty(Element.prototype, 'textContent', {
+    get: function() {
+        return this.childNodes.map(function(n) {
+            return n instanceof TextNode ? n.text : n.textContent;
+        }).join('');
+    },
+    set: function(value) {
+        this.childNodes = [];
+        this.appendChild(new TextNode(String(value)));
+    }
+});
+
+Object.defineProperty(Element.prototype, 'innerHTML', {
+    get: function() {
+        return this.childNodes.map(function(n) { return n.serialize(); }).join('');
+    },
+    set: function(html) {
+        var target = this.content || this;
+        target.childNodes.forEach(function(n) { n.parentNode = null; });
+        target.childNodes = [];
+        parseInto(target, html);
+    }
+});
+
+Element.prototype.serialize = function() {
+    var tag = this.tagName.toLowerCase();
+    var attrs = this.attributes;
+    var out = '<' + tag + Object.keys(attrs).map(function(name) {
+        return ' ' + name + '="' + attrs[name].replace(/"/g, '&quot;') + '"';
+    }).join('') + '>';
+    if (VOID_TAGS[tag]) return out;
+    return out + this.innerHTML + '</' + tag + '>';
+};
+
+var TOKEN_RE = /<(\/?)([a-zA-Z0-9]+)([^>]*)>|([^<]+)/g;
+var ATTR_RE = /([a-zA-Z_:][\w:.-]*)(?:\s*=\s*"([^"]*)")?/g;
+
+function parseInto(root, html) {
+    var stack = [root];
+    var match;
+    TOKEN_RE.lastIndex = 0;
+    while ((match = TOKEN_RE.exec(html)) !== null) {
+        var parent = stack[stack.length - 1];
+        if (match[4] !== undefined) {
+            parent.appendChild(new TextNode(match[4]
+                .replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&')));
+        } else if (match[1]) {
+            if (stack.length > 1) stack.pop();
+        } else {
+            var el = new Element(match[2]);
+            var attr;
+            ATTR_RE.lastIndex = 0;
+            while ((attr = ATTR_RE.exec(match[3])) !== null) {
+                el.attributes[attr[1]] = (attr[2] || '').replace(/&quot;/g, '"');
+            }
+            parent.appendChild(el);
+            if (!VOID_TAGS[match[2].toLowerCase()]) stack.push(el);
+        }
+    }
+}
+
+function createContext() {
+    var byId = {};
+    var document = {
+        body: new Element('body'),
+        createElement: function(tag) { return new Element(tag); },
+        createDocumentFragment: function() { return new Fragment(); },
+        getElementById: function(id) { return byId[id] || null; },
+        querySelector: function() { return null; },
+        querySelectorAll: function() { return []; },
+        addEventListener: function() {}
+    };
+    var window = {
+        innerHeight: VIEWPORT_HEIGHT,
+        addEventListener: function() {},
+        removeEventListener: function() {},
+        getComputedStyle: function() { return { rowGap: '8px', marginTop: '0', marginBottom: '0' }; }
+    };
+    byId.itemsList = new Element('div');
+    byId.emptyState = new Element('div');
+
+    var context = {
+        document: document,
+        window: window,
+        localStorage: { getItem: function() { return null; }, setItem: function() {} },
+        navigator: {},
+        requestAnimationFrame: function(fn) { fn(); },
+        setTimeout: setTimeout,
+        clearTimeout: clearTimeout,
+        console: console
+    };
+    vm.createContext(context);
+    vm.runInContext(fs.readFileSync(path.join(__dirname, '..', 'frontend', 'js', 'app.js'), 'utf8'), context);
+    return context;
+}
+
+// ============================================
+// RENDERERS UNDER TEST
+// ============================================
+// The loop app.js used before rendering was batched
+var LEGACY_PROCURE = [
+    'function legacyRenderProcure(items) {',
+    '    var itemsList = document.getElementById("itemsList");',
+    '    itemsList.innerHTML = "";',
+    '    itemsList.innerHTML += \'<div class="section-header"><h3>Active Items</h3>\' +',
+    '        \'<span class="section-count">\' + items.length + \' items</span></div>\';',
+    '    items.forEach(function(item, index) {',
+    '        itemsList.innerHTML += createProcureItemCard(item, false, index);',
+    '    });',
+    '}'
+].join('\n');
+
+function makeItems(count) {
+    var items = [];
+    for (var i = 0; i < count; i++) {
+        items.push({
+            id: i + 1, name: 'Item ' + i, category: 'grocery',
+            to_procure: true, consumed: false
+        });
+    }
+    return items;
+}
+
+function timeRender(context, fn, items) {
+    var start = process.hrtime.bigint();
+    fn(items);
+    var ms = Number(process.hrtime.bigint() - start) / 1e6;
+    var rows = context.document.getElementById('itemsList').childNodes.length;
+    return { ms: ms, rows: rows };
+}
+
+function main() {
+    var counts = process.argv.slice(2).map(Number);
+    if (counts.length === 0) counts = [1000, 10000];
+
+    var context = createContext();
+    vm.runInContext(LEGACY_PROCURE, context);
+
+    console.log('\n  ' + pad('renderer', 34) + pad('items', 8) + pad('ms', 12) + 'DOM rows');
+    counts.forEach(function(count) {
+        var items = makeItems(count);
+        var cases = [
+            ['procure: innerHTML += (old)', function() {
+                context.VIRTUALIZE_THRESHOLD = Infinity;
+                return context.legacyRenderProcure;
+            }],
+            ['procure: one fragment', function() {
+                context.VIRTUALIZE_THRESHOLD = Infinity;
+                return context.renderProcureList;
+            }],
+            ['procure: virtualized', function() {
+                context.VIRTUALIZE_THRESHOLD = 150;
+                return context.renderProcureList;
+            }],
+            ['full list: one fragment', function() {
+                context.VIRTUALIZE_THRESHOLD = Infinity;
+                return context.renderFullList;
+            }],
+            ['full list: virtualized', function() {
+                context.VIRTUALIZE_THRESHOLD = 150;
+                return context.renderFullList;
+            }]
+        ];
+        cases.forEach(function(entry) {
+            if (entry[1]() === context.legacyRenderProcure && count > LEGACY_MAX_ITEMS) {
+                var base = timeRender(context, context.legacyRenderProcure,
+                                      items.slice(0, LEGACY_MAX_ITEMS));
+                var estimate = base.ms * Math.pow(count / LEGACY_MAX_ITEMS, 2);
+                console.log('  ' + pad(entry[0], 34) + pad(String(count), 8) +
+                    pad('~' + estimate.toFixed(0), 12) + '(extrapolated)');
+                return;
+            }
+            var result = timeRender(context, entry[1](), items);
+            console.log('  ' + pad(entry[0], 34) + pad(String(count), 8) +
+                pad(result.ms.toFixed(1), 12) + result.rows);
+        });
+    });
+}
+
+function pad(text, width) {
+    while (text.length < width) text += ' ';
+    return text;
+}
+
+main();
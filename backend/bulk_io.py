@@ -0,0 +1,159 @@
+# backend/bulk_io.py
+import csv
+import io
+import json
+
+from sqlalchemy import select, insert, tuple_
+
+from models import db, Item
+from catalog import merged_items_stmt
+from categories import categories
+
+EXPORT_FIELDS = ['category', 'name', 'is_active', 'to_procure', 'consumed']
+EXPORT_BATCH_SIZE = 500
+IMPORT_CHUNK_SIZE = 500
+
+
+# ============ EXPORT ============
+
+def iter_user_items(user, category=None):
+    """Yield the user's visible item rows as tuples from a server-side cursor"""
+    merged = merged_items_stmt(user, category).subquery()
+    columns = [merged.c[field] for field in EXPORT_FIELDS]
+    stmt = select(*columns).order_by(
+        merged.c.category, merged.c.name).execution_options(
+        stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    result = db.session.execute(stmt)
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+
+def export_ndjson(user, category=None):
+    for row in iter_user_items(user, category):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n'
+
+
+def export_csv(user, category=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for row in iter_user_items(user, category):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# ============ IMPORT ============
+
+def _parse_bool(value, default=False):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def normalize_row(data):
+    """Return a clean item dict, or None if the row is invalid"""
+    if not isinstance(data, dict):
+        return None
+    name = str(data.get('name') or '').strip()
+    category = str(data.get('category') or '').strip()
+    if not name or len(name) > 100 or categories.get(category) is None:
+        return None
+    # Databases such as PostgreSQL reject NUL in text columns
+    if '\x00' in name:
+        return None
+    return {
+        'name': name,
+        'category': category,
+        'is_active': _parse_bool(data.get('is_active'), default=True),
+        'to_procure': _parse_bool(data.get('to_procure')),
+        'consumed': _parse_bool(data.get('consumed')),
+    }
+
+
+def parse_ndjson(stream):
+    """Yield dicts (or None for bad lines) from a binary NDJSON stream"""
+    for line in io.TextIOWrapper(stream, encoding='utf-8', errors='replace'):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def parse_csv(stream):
+    """Yield dicts (or None for bad rows) from a binary CSV stream with a header row"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig',
+                            errors='replace', newline='')
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            # e.g. a NUL byte or a field over csv.field_size_limit();
+            # the reader resumes at the next line
+            yield None
+
+
+def _insert_chunk(user, chunk):
+    """Insert rows not already present; return (inserted, duplicates)"""
+    keys = list(chunk)
+    merged = merged_items_stmt(user).subquery()
+    existing = set(db.session.execute(
+        select(merged.c.category, merged.c.name).where(
+            tuple_(merged.c.category, merged.c.name).in_(keys)
+        )
+    ).all())
+    rows = []
+    for key in keys:
+        if key in existing:
+            continue
+        row = dict(chunk[key], user_id=user.id)
+        row['category_id'] = categories.id_for(row.pop('category'))
+        rows.append(row)
+    if rows:
+        db.session.execute(insert(Item), rows)
+    db.session.commit()
+    return len(rows), len(keys) - len(rows)
+
+
+def import_items(user, records, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Load parsed records in chunks with bulk INSERTs, skipping invalid rows
+    and rows whose (category, name) is already on the user's list.
+    Only one chunk is held in memory at a time.
+    """
+    stats = {'imported': 0, 'duplicates': 0, 'skipped': 0}
+    chunk = {}
+    for record in records:
+        row = normalize_row(record)
+        if row is None:
+            stats['skipped'] += 1
+            continue
+        key = (row['category'], row['name'])
+        if key in chunk:
+            stats['duplicates'] += 1
+            continue
+        chunk[key] = row
+        if len(chunk) >= chunk_size:
+            inserted, dupes = _insert_chunk(user, chunk)
+            stats['imported'] += inserted
+            stats['duplicates'] += dupes
+            chunk = {}
+    if chunk:
+        inserted, dupes = _insert_chunk(user, chunk)
+        stats['imported'] += inserted
+        stats['duplicates'] += dupes
+    return stats
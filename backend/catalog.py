@@ -0,0 +1,178 @@
+# backend/catalog.py
+from sqlalchemy import select, literal, null, union_all, exists, func, and_, insert, delete
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User, Item, CatalogItem, Category
+
+DEFAULT_CATALOG = {
+    'vegfruit': [
+        'Tomato', 'Potato', 'Onion', 'Carrot', 'Spinach', 'Broccoli',
+        'Capsicum', 'Cucumber', 'Cabbage', 'Cauliflower', 'Green Beans',
+        'Peas', 'Corn', 'Lettuce', 'Mushroom', 'Garlic', 'Ginger',
+        'Apple', 'Banana', 'Orange', 'Mango', 'Grapes', 'Watermelon',
+        'Strawberry', 'Pineapple', 'Papaya', 'Lemon', 'Pomegranate',
+        'Guava', 'Kiwi'
+    ],
+    'grocery': [
+        'Rice', 'Wheat Flour', 'Sugar', 'Salt', 'Cooking Oil', 'Butter',
+        'Milk', 'Bread', 'Eggs', 'Tea', 'Coffee', 'Pasta', 'Noodles',
+        'Oats', 'Cornflakes', 'Biscuits', 'Jam', 'Honey', 'Ketchup',
+        'Soy Sauce', 'Vinegar', 'Pepper', 'Turmeric', 'Cumin',
+        'Coriander Powder', 'Chili Powder', 'Cinnamon', 'Cardamom',
+        'Dal / Lentils', 'Chickpeas'
+    ],
+}
+
+# Catalog entries are exposed to the client with negative ids so they
+# never collide with Item ids; the first write materializes an override.
+ITEM_COLUMNS = ('id', 'name', 'category', 'is_active',
+                'to_procure', 'consumed', 'created_at')
+
+# category -> number of catalog entries, filled once per process
+_catalog_counts = {}
+
+
+def seed_catalog():
+    """Insert any missing default catalog entries"""
+    existing = set(db.session.execute(
+        select(CatalogItem.category, CatalogItem.name)).all())
+    rows = [{'category': category, 'name': name}
+            for category, names in DEFAULT_CATALOG.items()
+            for name in names if (category, name) not in existing]
+    if rows:
+        db.session.execute(insert(CatalogItem), rows)
+        db.session.commit()
+    _catalog_counts.clear()
+
+
+def catalog_count(category):
+    if not _catalog_counts:
+        counts = db.session.execute(
+            select(CatalogItem.category, func.count())
+            .group_by(CatalogItem.category)).all()
+        _catalog_counts.update(dict(counts))
+    return _catalog_counts.get(category, 0)
+
+
+def merged_items_stmt(user, category=None):
+    """
+    One SELECT returning the user's visible list: their own rows plus
+    every catalog entry they have not overridden, in the Item.to_dict shape.
+    Catalog entries keep their category slug; own rows join it in.
+    """
+    own = select(
+        Item.id, Item.name, Category.slug.label('category'), Item.is_active,
+        Item.to_procure, Item.consumed, Item.created_at
+    ).join(Category, Category.id == Item.category_id).where(
+        Item.user_id == user.id, Item.hidden.is_(False))
+    if category:
+        own = own.where(Item.category == category)
+
+    if not user.uses_catalog:
+        return own.order_by(Item.name)
+
+    overridden = exists().where(
+        Item.user_id == user.id, Item.catalog_id == CatalogItem.id)
+    shared = select(
+        (-CatalogItem.id).label('id'), CatalogItem.name, CatalogItem.category,
+        literal(True).label('is_active'), literal(False).label('to_procure'),
+        literal(False).label('consumed'), null().label('created_at')
+    ).where(~overridden)
+    if category:
+        shared = shared.where(CatalogItem.category == category)
+
+    merged = union_all(own, shared).subquery()
+    return select(merged).order_by(merged.c.name)
+
+
+def get_user_items(user, category):
+    """
+    The user's list as plain dicts of column values; no ORM objects.
+    created_at stays a datetime, which the JSON provider writes as ISO 8601.
+    """
+    rows = db.session.execute(merged_items_stmt(user, category)).tuples()
+    return [dict(zip(ITEM_COLUMNS, row)) for row in rows]
+
+
+def resolve_item(user, item_id):
+    """
+    Return the user's Item for item_id. Negative ids refer to catalog
+    entries; an override row is created for them on first access.
+    """
+    if item_id >= 0:
+        return Item.query.filter_by(id=item_id, user_id=user.id).first()
+    if not user.uses_catalog:
+        return None
+
+    catalog_id = -item_id
+    item = Item.query.filter_by(user_id=user.id, catalog_id=catalog_id).first()
+    if item:
+        return None if item.hidden else item
+    entry = db.session.get(CatalogItem, catalog_id)
+    if not entry:
+        return None
+    item = Item(name=entry.name, category=entry.category,
+                catalog_id=entry.id, user_id=user.id)
+    try:
+        # A savepoint, so losing the race keeps the caller's other changes
+        with db.session.begin_nested():
+            db.session.add(item)
+    except IntegrityError:
+        # A concurrent request created the override first; use that one
+        item = Item.query.filter_by(user_id=user.id, catalog_id=catalog_id).one()
+        return None if item.hidden else item
+    return item
+
+
+def find_catalog_entry(category, name):
+    return CatalogItem.query.filter_by(category=category, name=name).first()
+
+
+def migrate_user_to_catalog(user):
+    """
+    Convert a user's copied default rows into catalog overrides: link rows
+    to their catalog entry, hide entries the user had deleted, and drop
+    rows that still hold the default state.
+    """
+    catalog_match = select(CatalogItem.id).join(
+        Category, Category.slug == CatalogItem.category
+    ).where(
+        Category.id == Item.category_id,
+        CatalogItem.name == Item.name
+    ).scalar_subquery()
+    db.session.execute(
+        Item.__table__.update()
+        .where(Item.user_id == user.id, Item.catalog_id.is_(None))
+        .values(catalog_id=catalog_match))
+
+    missing = select(
+        CatalogItem.name, Category.id, CatalogItem.id,
+        literal(user.id), literal(True)
+    ).join(Category, Category.slug == CatalogItem.category).where(~exists().where(
+        Item.user_id == user.id, Item.catalog_id == CatalogItem.id))
+    db.session.execute(
+        insert(Item).from_select(
+            ['name', 'category_id', 'catalog_id', 'user_id', 'hidden'], missing))
+
+    db.session.execute(delete(Item).where(and_(
+        Item.user_id == user.id,
+        Item.catalog_id.isnot(None),
+        Item.hidden.is_(False),
+        Item.is_active.is_(True),
+        Item.to_procure.is_(False),
+        Item.consumed.is_(False),
+    )))
+
+    user.uses_catalog = True
+    db.session.commit()
+
+
+def migrate_all_users_to_catalog(batch_size=500):
+    migrated = 0
+    while True:
+        users = User.query.filter_by(uses_catalog=False).limit(batch_size).all()
+        if not users:
+            return migrated
+        for user in users:
+            migrate_user_to_catalog(user)
+            migrated += 1
@@ -0,0 +1,100 @@
+# backend/categories.py
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import select, insert
+
+# slug, label, page (URL and template stem), position
+DEFAULT_CATEGORIES = [
+    ('vegfruit', 'Vegetables & Fruits', 'vegfruits', 1),
+    ('grocery', 'Groceries', 'groceries', 2),
+]
+
+# A miss reloads the table at most this often, so a category added by
+# another worker shows up without hammering the database with bad slugs
+RELOAD_INTERVAL_SECONDS = 30
+
+CategoryInfo = namedtuple('CategoryInfo', 'id slug label page position')
+
+
+class CategoryCache:
+    """
+    The category table held in memory once per process. Rows store the
+    small integer id; requests and templates deal in slugs.
+    """
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_slug = {}
+        self._by_page = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from models import db, Category
+        rows = db.session.execute(
+            select(Category.id, Category.slug, Category.label,
+                   Category.page, Category.position)
+            .order_by(Category.position, Category.id)
+        ).all()
+        infos = [CategoryInfo(*row) for row in rows]
+        with self._lock:
+            self._by_id = {info.id: info for info in infos}
+            self._by_slug = {info.slug: info for info in infos}
+            self._by_page = {info.page: info for info in infos if info.page}
+            self._loaded_at = time.monotonic()
+
+    def _lookup(self, table, key):
+        if self._loaded_at is None:
+            self._load()
+        info = getattr(self, table).get(key)
+        if info is None and time.monotonic() - self._loaded_at > RELOAD_INTERVAL_SECONDS:
+            self._load()
+            info = getattr(self, table).get(key)
+        return info
+
+    def get(self, slug):
+        return self._lookup('_by_slug', slug) if isinstance(slug, str) else None
+
+    def get_by_id(self, category_id):
+        return self._lookup('_by_id', category_id)
+
+    def get_by_page(self, page):
+        return self._lookup('_by_page', page)
+
+    def id_for(self, slug):
+        """Integer key for slug; raises ValueError for unknown slugs"""
+        info = self.get(slug)
+        if info is None:
+            raise ValueError(f"Unknown category: {slug!r}")
+        return info.id
+
+    def slug_for(self, category_id):
+        info = self.get_by_id(category_id)
+        return info.slug if info else None
+
+    def all(self):
+        if self._loaded_at is None:
+            self._load()
+        return list(self._by_id.values())
+
+    def clear(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+categories = CategoryCache()
+
+
+def seed_categories():
+    """Insert any missing default categories"""
+    from models import db, Category
+    existing = set(db.session.execute(select(Category.slug)).scalars())
+    rows = [{'slug': slug, 'label': label, 'page': page, 'position': position}
+            for slug, label, page, position in DEFAULT_CATEGORIES
+            if slug not in existing]
+    if rows:
+        db.session.execute(insert(Category), rows)
+        db.session.commit()
+    categories.clear()
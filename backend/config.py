@@ -2,6 +2,21 @@
 import os
 
 
+def get_replica_binds():
+    """
+    Read replica URLs from DATABASE_REPLICA_URLS (comma-separated).
+    For local testing, point it at a copy of the primary SQLite file,
+    e.g. DATABASE_REPLICA_URLS=sqlite:////tmp/home_needs_replica.db
+    """
+    binds = {}
+    urls = os.environ.get('DATABASE_REPLICA_URLS', '')
+    for i, url in enumerate(u.strip() for u in urls.split(',') if u.strip()):
+        if url.startswith('postgres://'):
+            url = url.replace('postgres://', 'postgresql://', 1)
+        binds[f'replica_{i}'] = url
+    return binds
+
+
 class Config:
     SECRET_KEY = os.environ.get(
         'SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -9,17 +24,61 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         'DATABASE_URL') or 'sqlite:///home_needs.db'
 
+    # 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Serve user-independent pages from pre-rendered, compressed bytes
+    PAGE_CACHE_ENABLED = True
+    # Inline each page's critical CSS (built by build_css.py) and load the
+    # rest after the markup; off, or unbuilt, serves the full style.css
+    PAGE_STYLES_ENABLED = True
+
+    # Read replicas for safe GET reads
+    SQLALCHEMY_BINDS = get_replica_binds()
+    # Reads stay on the primary this long after the session's last write
+    REPLICA_STICKY_SECONDS = 10
+    # A failed replica is skipped for this long
+    REPLICA_RETRY_SECONDS = 30
+
+    # Concurrent identical item/stats reads share one query per process;
+    # a waiter gives up on a stuck leader after this long and queries itself
+    SINGLE_FLIGHT_ENABLED = True
+    SINGLE_FLIGHT_WAIT_SECONDS = 10
+
+    # Most item states one PUT /api/items/state may set
+    ITEM_STATE_BATCH_MAX = 200
+    # Most queued offline operations one POST /api/batch may replay
+    BATCH_MAX_OPS = 100
+
+    # Login/signup rate limits as (attempts, per seconds)
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_STORAGE_URI = os.environ.get('RATE_LIMIT_STORAGE_URI', 'memory://')
+    RATE_LIMIT_TRUSTED_PROXIES = 0
+    RATE_LIMIT_LOGIN_IP = (20, 60)
+    RATE_LIMIT_LOGIN_USER = (5, 300)
+    RATE_LIMIT_SIGNUP_IP = (5, 600)
+    RATE_LIMIT_SIGNUP_USER = (3, 600)
+    # Per pending account: a code allows VERIFICATION_MAX_ATTEMPTS guesses
+    RATE_LIMIT_VERIFY_IP = (20, 600)
+    RATE_LIMIT_VERIFY_USER = (10, 600)
+    RATE_LIMIT_RESEND_IP = (10, 600)
+    RATE_LIMIT_RESEND_USER = (3, 600)
+
     # Email Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
 
-    # Port 587 = TLS, Port 465 = SSL
+    # Port 587 = TLS, Port 465 = SSL, anything else (e.g. a local
+    # stand-in on 1025) = plain SMTP
     if MAIL_PORT == 465:
         MAIL_USE_TLS = False
         MAIL_USE_SSL = True
-    else:
+    elif MAIL_PORT == 587:
         MAIL_USE_TLS = True
         MAIL_USE_SSL = False
+    else:
+        MAIL_USE_TLS = False
+        MAIL_USE_SSL = False
 
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
@@ -28,6 +87,21 @@ class Config:
     MAIL_ASCII_ATTACHMENTS = False
     MAIL_TIMEOUT = 10  # 10 second timeout
 
+    # Background outbox: requests only enqueue, dispatcher threads send
+    MAIL_QUEUE_ENABLED = os.environ.get('MAIL_QUEUE_ENABLED', '0') == '1'
+    MAIL_QUEUE_WORKERS = int(os.environ.get('MAIL_QUEUE_WORKERS', 1))
+    MAIL_QUEUE_BATCH_SIZE = 20
+    MAIL_QUEUE_POLL_SECONDS = 5
+    MAIL_QUEUE_IDLE_SECONDS = 60  # close the SMTP session after this idle time
+    MAIL_QUEUE_MAX_ATTEMPTS = 5
+
+    # Email verification only makes sense when mail can actually be sent
+    EMAIL_VERIFICATION_REQUIRED = MAIL_QUEUE_ENABLED
+    VERIFICATION_STORE_URI = os.environ.get('VERIFICATION_STORE_URI', 'memory://')
+    VERIFICATION_STORE_MAX = 10000
+    VERIFICATION_CODE_TTL = 600  # seconds
+    VERIFICATION_MAX_ATTEMPTS = 5
+
     @staticmethod
     def log_mail_config():
         username = os.environ.get('MAIL_USERNAME')
@@ -57,6 +131,13 @@ class ProductionConfig(Config):
         _db_url = _db_url.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_DATABASE_URI = _db_url or 'sqlite:///home_needs.db'
 
+    # Shared by both gunicorn workers; Render adds one proxy hop
+    RATE_LIMIT_STORAGE_URI = os.environ.get(
+        'RATE_LIMIT_STORAGE_URI', 'sqlite:////tmp/home_needs_ratelimit.db')
+    RATE_LIMIT_TRUSTED_PROXIES = 1
+    VERIFICATION_STORE_URI = os.environ.get(
+        'VERIFICATION_STORE_URI', 'sqlite:////tmp/home_needs_codes.db')
+
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
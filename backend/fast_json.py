@@ -0,0 +1,76 @@
+# backend/fast_json.py
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib backend is used instead
+    orjson = None
+
+
+# ============ BACKENDS ============
+# Each backend turns an object into UTF-8 bytes. Both write datetimes as
+# ISO 8601, so lean queries can hand over raw column values.
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def orjson_dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_backend(name):
+    """'auto' picks orjson when it is installed"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError("JSON_BACKEND is 'orjson' but orjson is not installed")
+        return 'orjson', orjson_dumps
+    if name == 'stdlib':
+        return 'stdlib', stdlib_dumps
+    raise ValueError(f"Unsupported JSON_BACKEND: {name}")
+
+
+# ============ PROVIDER ============
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify() through the configured backend. Responses are built from
+    bytes directly; debug mode keeps Flask's indented output.
+    """
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.backend, self._dumps = get_backend(app.config.get('JSON_BACKEND', 'auto'))
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj), mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
+    app.extensions['fast_json'] = app.json
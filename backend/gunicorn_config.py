@@ -1,6 +1,9 @@
 # backend/gunicorn_config.py
 bind = "0.0.0.0:8000"
 workers = 2
+# gthread workers; lets concurrent reads from one user share a query
+# (single_flight.py)
+threads = 4
 timeout = 120
 accesslog = "-"
 errorlog = "-"
@@ -0,0 +1,125 @@
+# backend/history.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, tuple_
+
+from models import db, ItemEvent, DailyRollup, JobCursor
+from categories import categories
+
+ROLLUP_JOB = 'daily_rollup'
+ROLLUP_BATCH_SIZE = 5000
+ROLLUP_ACTIONS = ('procured', 'unprocured', 'consumed', 'unconsumed', 'deleted')
+MAX_TREND_DAYS = 90
+# Only events at least this old are rolled up. Ids are assigned at insert
+# but become visible at commit, so a younger event with a higher id can be
+# visible while a lower id is still uncommitted; the lag waits those out.
+ROLLUP_SAFETY_LAG_SECONDS = 60
+
+
+def record_event(item, action):
+    """Add an event for item to the current transaction"""
+    db.session.add(ItemEvent(
+        user_id=item.user_id, item_id=item.id, name=item.name,
+        category=item.category, action=action
+    ))
+
+
+# ============ ROLLUP JOB ============
+
+def _get_cursor():
+    cursor = db.session.execute(
+        select(JobCursor).where(JobCursor.name == ROLLUP_JOB).with_for_update()
+    ).scalar_one_or_none()
+    if cursor is None:
+        cursor = JobCursor(name=ROLLUP_JOB, position=0)
+        db.session.add(cursor)
+    return cursor
+
+
+def _apply_counts(counts):
+    """Add {(user_id, day, category): {action: n}} onto the rollup rows"""
+    keys = list(counts)
+    existing = {
+        (row.user_id, row.day, row.category): row
+        for row in DailyRollup.query.filter(
+            tuple_(DailyRollup.user_id, DailyRollup.day, DailyRollup.category).in_(keys)
+        )
+    }
+    for key, actions in counts.items():
+        row = existing.get(key)
+        if row is None:
+            user_id, day, category = key
+            row = DailyRollup(user_id=user_id, day=day, category=category,
+                              **{action: 0 for action in ROLLUP_ACTIONS})
+            db.session.add(row)
+        for action, n in actions.items():
+            setattr(row, action, getattr(row, action) + n)
+
+
+def rollup_events(batch_size=ROLLUP_BATCH_SIZE, lag_seconds=ROLLUP_SAFETY_LAG_SECONDS):
+    """
+    Fold events newer than the stored cursor into DailyRollup.
+    Each batch updates the rollups and advances the cursor in one
+    transaction, so the job can be stopped and re-run at any point.
+    The cursor stops at the first event younger than lag_seconds; it and
+    everything after it wait for the next run.
+    Returns the number of events processed.
+    """
+    processed = 0
+    while True:
+        cutoff = datetime.utcnow() - timedelta(seconds=lag_seconds)
+        cursor = _get_cursor()
+        events = db.session.execute(
+            select(ItemEvent.id, ItemEvent.user_id, ItemEvent.category,
+                   ItemEvent.action, ItemEvent.created_at)
+            .where(ItemEvent.id > cursor.position)
+            .order_by(ItemEvent.id)
+            .limit(batch_size)
+        ).all()
+        settled = next((i for i, event in enumerate(events) if event[4] >= cutoff), len(events))
+        events = events[:settled]
+        if not events:
+            db.session.commit()
+            return processed
+
+        counts = defaultdict(lambda: defaultdict(int))
+        for _, user_id, category, action, created_at in events:
+            if action in ROLLUP_ACTIONS:
+                counts[(user_id, created_at.date(), category)][action] += 1
+        _apply_counts(counts)
+
+        cursor.position = events[-1][0]
+        db.session.commit()
+        processed += len(events)
+
+
+# ============ TRENDS ============
+
+def get_trends(user_id, days=14):
+    """
+    Daily counts for the last `days` days, oldest first, read from the
+    rollups only (at most days x categories rows).
+    """
+    days = max(1, min(days, MAX_TREND_DAYS))
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = DailyRollup.query.filter(
+        DailyRollup.user_id == user_id, DailyRollup.day >= since
+    ).all()
+
+    by_day = {}
+    for row in rows:
+        by_day[(row.day, row.category)] = row
+
+    trends = []
+    for offset in range(days):
+        day = since + timedelta(days=offset)
+        entry = {'day': day.isoformat()}
+        for category in (c.slug for c in categories.all()):
+            row = by_day.get((day, category))
+            entry[category] = {
+                action: getattr(row, action) if row else 0
+                for action in ROLLUP_ACTIONS
+            }
+        trends.append(entry)
+    return trends
@@ -0,0 +1,227 @@
+# backend/mail_queue.py
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from sqlalchemy import select, update, delete, or_
+
+from models import db, OutgoingMail
+
+LEASE_SECONDS = 120
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# Sent rows are only kept for troubleshooting; failed ones a while longer
+SENT_RETENTION_DAYS = 7
+FAILED_RETENTION_DAYS = 30
+
+
+def enqueue_mail(recipient, subject, body):
+    """Persist a message for the dispatcher; the only work done in a request"""
+    db.session.add(OutgoingMail(recipient=recipient, subject=subject, body=body))
+    db.session.commit()
+    dispatcher.notify()
+
+
+def prune_outbox(sent_days=SENT_RETENTION_DAYS, failed_days=FAILED_RETENTION_DAYS):
+    now = datetime.utcnow()
+    count = 0
+    for status, days in (('sent', sent_days), ('failed', failed_days)):
+        count += db.session.execute(
+            delete(OutgoingMail).where(
+                OutgoingMail.status == status,
+                OutgoingMail.created_at < now - timedelta(days=days))
+        ).rowcount
+    db.session.commit()
+    return count
+
+
+def backoff_seconds(attempts):
+    return min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
+
+
+class SMTPConnection:
+    """One SMTP session kept open across messages, reopened when it drops"""
+
+    def __init__(self, config):
+        self.config = config
+        self.smtp = None
+        self.last_used = 0
+
+    def open(self):
+        config = self.config
+        timeout = config.get('MAIL_TIMEOUT', 10)
+        if config.get('MAIL_USE_SSL'):
+            smtp = smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=timeout)
+        else:
+            smtp = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=timeout)
+            if config.get('MAIL_USE_TLS'):
+                smtp.starttls()
+        if config.get('MAIL_USERNAME') and config.get('MAIL_PASSWORD'):
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        self.smtp = smtp
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self.smtp = None
+
+    def send(self, message):
+        if self.smtp is None:
+            self.open()
+        try:
+            self.smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Server closed an idle session; reconnect once
+            self.smtp = None
+            self.open()
+            self.smtp.send_message(message)
+        self.last_used = time.time()
+
+
+class MailDispatcher:
+    """
+    Background threads that drain OutgoingMail. Each thread keeps its own
+    SMTP connection open across messages and sends claimed rows in batches.
+    Rows are claimed with a lease, so several workers can share the table
+    and a crashed sender's rows are picked up again once the lease expires.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['mail_dispatcher'] = self
+
+    def notify(self):
+        self._wake.set()
+
+    def start(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._spawn()
+
+    def _spawn(self):
+        for i in range(self.app.config.get('MAIL_QUEUE_WORKERS', 1)):
+            thread = threading.Thread(
+                target=self._run, name=f'mail-dispatcher-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _run(self):
+        conn = SMTPConnection(self.app.config)
+        poll = self.app.config.get('MAIL_QUEUE_POLL_SECONDS', 5)
+        idle = self.app.config.get('MAIL_QUEUE_IDLE_SECONDS', 60)
+        while not self._stop.is_set():
+            try:
+                sent = self.run_once(conn)
+            except Exception as e:
+                print(f"[MAIL QUEUE] Dispatcher error: {e}")
+                sent = 0
+            if sent:
+                continue
+            if conn.smtp is not None and time.time() - conn.last_used > idle:
+                conn.close()
+            self._wake.wait(poll)
+            self._wake.clear()
+        conn.close()
+
+    def _claim_batch(self):
+        now = datetime.utcnow()
+        batch_size = self.app.config.get('MAIL_QUEUE_BATCH_SIZE', 20)
+        candidates = db.session.execute(
+            select(OutgoingMail.id)
+            .where(OutgoingMail.status == 'pending',
+                   OutgoingMail.next_attempt_at <= now,
+                   or_(OutgoingMail.locked_until.is_(None),
+                       OutgoingMail.locked_until < now))
+            .order_by(OutgoingMail.id)
+            .limit(batch_size)
+        ).scalars().all()
+
+        claimed = []
+        lease = now + timedelta(seconds=LEASE_SECONDS)
+        for mail_id in candidates:
+            result = db.session.execute(
+                update(OutgoingMail)
+                .where(OutgoingMail.id == mail_id,
+                       OutgoingMail.status == 'pending',
+                       or_(OutgoingMail.locked_until.is_(None),
+                           OutgoingMail.locked_until < now))
+                .values(locked_until=lease))
+            if result.rowcount == 1:
+                claimed.append(mail_id)
+        db.session.commit()
+        if not claimed:
+            return []
+        return OutgoingMail.query.filter(OutgoingMail.id.in_(claimed)).all()
+
+    def _build_message(self, mail):
+        message = EmailMessage()
+        message['From'] = self.app.config.get('MAIL_DEFAULT_SENDER')
+        message['To'] = mail.recipient
+        message['Subject'] = mail.subject
+        message.set_content(mail.body)
+        return message
+
+    def run_once(self, conn=None):
+        """Claim and send one batch; returns the number of messages sent"""
+        own_conn = conn is None
+        conn = conn or SMTPConnection(self.app.config)
+        max_attempts = self.app.config.get('MAIL_QUEUE_MAX_ATTEMPTS', 5)
+        sent = 0
+        with self.app.app_context():
+            try:
+                for mail in self._claim_batch():
+                    try:
+                        conn.send(self._build_message(mail))
+                    except Exception as e:
+                        # Any failure counts as an attempt, or a message that
+                        # can't even be built would be retried forever
+                        if isinstance(e, (smtplib.SMTPException, OSError)):
+                            conn.close()
+                        mail.attempts += 1
+                        mail.last_error = str(e)[:300]
+                        mail.locked_until = None
+                        if mail.attempts >= max_attempts:
+                            mail.status = 'failed'
+                        else:
+                            mail.next_attempt_at = datetime.utcnow() + timedelta(
+                                seconds=backoff_seconds(mail.attempts))
+                        print(f"[MAIL QUEUE] Send to {mail.recipient} failed "
+                              f"(attempt {mail.attempts}): {e}")
+                    else:
+                        mail.status = 'sent'
+                        mail.sent_at = datetime.utcnow()
+                        mail.locked_until = None
+                        sent += 1
+                    db.session.commit()
+            finally:
+                db.session.remove()
+                if own_conn:
+                    conn.close()
+        return sent
+
+
+dispatcher = MailDispatcher()
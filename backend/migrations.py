@@ -0,0 +1,143 @@
+# backend/migrations.py
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateColumn
+
+from models import db
+
+# Statements that fill a newly added column from existing data.
+# They run before the table's indexes are created.
+BACKFILLS = {
+    ('user', 'name_lower'):
+        'UPDATE "user" SET name_lower = lower(trim(name)) WHERE name_lower IS NULL',
+    ('user', 'email_lower'):
+        'UPDATE "user" SET email_lower = lower(trim(email)) WHERE email_lower IS NULL',
+    ('item', 'category_id'):
+        'UPDATE item SET category_id = (SELECT id FROM category '
+        'WHERE category.slug = item.category) WHERE category_id IS NULL',
+    ('deleted_item', 'category_id'):
+        'UPDATE deleted_item SET category_id = (SELECT id FROM category '
+        'WHERE category.slug = deleted_item.category) WHERE category_id IS NULL',
+}
+
+# Statements that make existing rows fit a new unique index, and what
+# happened to the rows they changed. Legacy users whose names or emails
+# differ only in case keep the oldest account on the lowered key; the
+# others get NULL and log in by exact name (see login()).
+INDEX_PREPARES = {
+    'uq_user_name_lower': (
+        'UPDATE "user" SET name_lower = NULL WHERE name_lower IS NOT NULL '
+        'AND id NOT IN (SELECT min(id) FROM "user" '
+        'WHERE name_lower IS NOT NULL GROUP BY name_lower)',
+        'keep working by exact name'),
+    'uq_user_email_lower': (
+        'UPDATE "user" SET email_lower = NULL WHERE email_lower IS NOT NULL '
+        'AND id NOT IN (SELECT min(id) FROM "user" '
+        'WHERE email_lower IS NOT NULL GROUP BY email_lower)',
+        'no longer block signups with their email'),
+    # Racing first writes could each create an override of the same
+    # catalog item; keep the newest
+    'uq_item_user_catalog': (
+        'DELETE FROM item WHERE catalog_id IS NOT NULL '
+        'AND id NOT IN (SELECT max(id) FROM item '
+        'WHERE catalog_id IS NOT NULL GROUP BY user_id, catalog_id)',
+        'were duplicate overrides and were deleted'),
+}
+
+# Indexes replaced by a unique one above, dropped once it exists
+DROPPED_INDEXES = {
+    'ix_user_email_lower': 'uq_user_email_lower',
+    'ix_item_user_catalog': 'uq_item_user_catalog',
+}
+
+# Columns the models no longer have, dropped once every row was moved to
+# the replacement column. (table, old column) -> replacement column, or
+# None for columns whose data is no longer used
+DROPPED_COLUMNS = {
+    ('item', 'category'): 'category_id',
+    ('deleted_item', 'category'): 'category_id',
+    # Codes live in the verification store (verification.py)
+    ('user', 'verification_code'): None,
+    ('user', 'code_expiry'): None,
+}
+
+
+def upgrade_schema():
+    """
+    Bring existing tables up to date with the models.
+    create_all() only creates missing tables, so add any missing columns
+    and indexes here, and drop columns listed in DROPPED_COLUMNS.
+    Safe to run on every startup.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}'))
+                backfill = BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    conn.execute(text(backfill))
+            print(f"[MIGRATE] Added column {table.name}.{column.name}")
+
+        for column_name in existing_columns - set(table.columns.keys()):
+            if (table.name, column_name) in DROPPED_COLUMNS:
+                replacement = DROPPED_COLUMNS[(table.name, column_name)]
+                drop_column(engine, table.name, column_name, replacement)
+
+        existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if index.name in INDEX_PREPARES:
+                prepare, outcome = INDEX_PREPARES[index.name]
+                with engine.begin() as conn:
+                    changed = conn.execute(text(prepare)).rowcount
+                if changed:
+                    print(f"[MIGRATE] ⚠ {changed} rows in {table.name} collided "
+                          f"on {index.name}; they {outcome}")
+            try:
+                index.create(bind=engine)
+                print(f"[MIGRATE] Created index {index.name}")
+                existing_indexes.add(index.name)
+            except (IntegrityError, OperationalError, ProgrammingError) as e:
+                # e.g. a unique index over rows that already collide;
+                # leave the table usable and report it
+                print(f"[MIGRATE] ⚠ Could not create index {index.name}: {e.orig}")
+
+        for index_name in existing_indexes & DROPPED_INDEXES.keys():
+            if DROPPED_INDEXES[index_name] in existing_indexes:
+                with engine.begin() as conn:
+                    conn.execute(text(f'DROP INDEX {index_name}'))
+                print(f"[MIGRATE] Dropped index {index_name}")
+
+
+def drop_column(engine, table_name, column_name, replacement):
+    """
+    Drop an old column once every row has its replacement. Rows that did
+    not convert stop startup: the old column is NOT NULL and the models no
+    longer write it, so running on would fail every insert.
+    """
+    with engine.begin() as conn:
+        if replacement:
+            unconverted = conn.execute(text(
+                f'SELECT {column_name}, count(*) FROM "{table_name}" '
+                f'WHERE {replacement} IS NULL GROUP BY {column_name}'
+            )).all()
+            if unconverted:
+                values = ', '.join(f'{value!r} ({count} rows)' for value, count in unconverted)
+                raise RuntimeError(
+                    f"[MIGRATE] Cannot drop {table_name}.{column_name}: no {replacement} "
+                    f"for {values}. Add these to the category table or fix the rows, "
+                    f"then restart.")
+        conn.execute(text(f'ALTER TABLE "{table_name}" DROP COLUMN {column_name}'))
+    print(f"[MIGRATE] Dropped column {table_name}.{column_name}")
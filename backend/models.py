@@ -3,23 +3,76 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy.ext.hybrid import hybrid_property, Comparator
+from replicas import RoutingSession
+from categories import categories
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def normalize(value):
+    return value.strip().lower() if value else value
+
+
+class CategorySlug(Comparator):
+    """Compare a category_id column against slugs, resolved through the cache"""
+
+    def __eq__(self, slug):
+        return self.expression == categories.id_for(slug)
+
+    def __ne__(self, slug):
+        return self.expression != categories.id_for(slug)
+
+
+def category_slug_property():
+    """
+    `category` as a slug over the integer category_id column, so
+    Item(category='grocery') and filter_by(category='grocery') keep working
+    while rows and indexes hold a small integer.
+    """
+    def get(self):
+        return categories.slug_for(self.category_id)
+
+    def set(self, slug):
+        self.category_id = categories.id_for(slug)
+
+    prop = hybrid_property(get, set)
+    return prop.comparator(lambda cls: CategorySlug(cls.category_id))
 
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    # Lower-cased copies for indexed, case-insensitive lookups
+    name_lower = db.Column(db.String(100), nullable=True)
+    email_lower = db.Column(db.String(120), nullable=True)
     dob = db.Column(db.Date, nullable=True)
     password_hash = db.Column(db.String(256), nullable=False)
     is_verified = db.Column(db.Boolean, default=False)
-    verification_code = db.Column(db.String(6), nullable=True)
-    code_expiry = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # New users read defaults from the shared catalog; users created before
+    # it keep their copied rows until migrate-catalog converts them
+    uses_catalog = db.Column(
+        db.Boolean, nullable=False, default=True, server_default=db.false())
 
     items = db.relationship('Item', backref='owner', lazy='dynamic')
 
+    __table_args__ = (
+        db.Index('uq_user_name_lower', 'name_lower', unique=True),
+        db.Index('uq_user_email_lower', 'email_lower', unique=True),
+    )
+
+    @db.validates('name')
+    def _set_name_lower(self, key, value):
+        self.name_lower = normalize(value)
+        return value
+
+    @db.validates('email')
+    def _set_email_lower(self, key, value):
+        self.email_lower = normalize(value)
+        return value
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -27,19 +80,54 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
 
-class Item(db.Model):
+class Category(db.Model):
+    """Item lists; the built-in ones are seeded by seed_categories()"""
+    # SQLite only assigns rowids to INTEGER PRIMARY KEY columns
+    id = db.Column(db.SmallInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    slug = db.Column(db.String(20), unique=True, nullable=False)
+    label = db.Column(db.String(50), nullable=False)
+    # URL and template stem of the category's pages, e.g. 'groceries'
+    page = db.Column(db.String(30), unique=True, nullable=True)
+    position = db.Column(db.SmallInteger, nullable=False, default=0)
+
+
+class CatalogItem(db.Model):
+    """Default items shared by every user"""
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    # 'vegfruit' or 'grocery'
     category = db.Column(db.String(20), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('category', 'name', name='uq_catalog_item_category_name'),
+    )
+
+
+class Item(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    # Nullable only so upgrade_schema can add it to existing tables
+    category_id = db.Column(
+        db.SmallInteger, db.ForeignKey('category.id'), nullable=True)
+    category = category_slug_property()
     is_active = db.Column(db.Boolean, default=True)
     to_procure = db.Column(db.Boolean, default=False)
     consumed = db.Column(db.Boolean, default=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Set when this row is the user's override of a catalog item
+    catalog_id = db.Column(
+        db.Integer, db.ForeignKey('catalog_item.id'), nullable=True)
+    # Hidden overrides remove a catalog item from the user's list
+    hidden = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('uq_item_user_catalog', 'user_id', 'catalog_id', unique=True),
+        db.Index('ix_item_user_category', 'user_id', 'category_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -56,9 +144,104 @@ class DeletedItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     original_id = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    category = db.Column(db.String(20), nullable=False)
+    category_id = db.Column(
+        db.SmallInteger, db.ForeignKey('category.id'), nullable=True)
+    category = category_slug_property()
     is_active = db.Column(db.Boolean, default=True)
     to_procure = db.Column(db.Boolean, default=False)
     consumed = db.Column(db.Boolean, default=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    catalog_id = db.Column(db.Integer, nullable=True)
     deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ItemEvent(db.Model):
+    """Append-only log of procure/consume/delete actions"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(20), nullable=False)
+    # procured, unprocured, consumed, unconsumed, deleted
+    action = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_item_event_user_created', 'user_id', 'created_at'),
+    )
+
+
+class DailyRollup(db.Model):
+    """Per-user, per-day, per-category event counts kept by the rollup job"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(20), primary_key=True)
+    procured = db.Column(db.Integer, nullable=False, default=0)
+    unprocured = db.Column(db.Integer, nullable=False, default=0)
+    consumed = db.Column(db.Integer, nullable=False, default=0)
+    unconsumed = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+
+
+class JobCursor(db.Model):
+    """Last processed position of an incremental background job"""
+    name = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ReorderSuggestion(db.Model):
+    """Estimated reorder interval per user item, written by the batch job"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(100), primary_key=True)
+    interval_days = db.Column(db.Float, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False)
+    last_procured_at = db.Column(db.DateTime, nullable=False)
+    next_due_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        days = round(self.interval_days)
+        return {
+            'name': self.name,
+            'category': self.category,
+            'interval_days': round(self.interval_days, 1),
+            'last_procured_at': self.last_procured_at.isoformat(),
+            'next_due_at': self.next_due_at.isoformat(),
+            'message': f"You usually buy {self.name} every {days} day{'s' if days != 1 else ''}"
+        }
+
+
+class OutgoingMail(db.Model):
+    """Persistent outbox drained by the background mail dispatcher"""
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    # pending, sent, failed
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # A dispatcher thread owns the row until this time
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(300), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_outgoing_mail_status_next', 'status', 'next_attempt_at'),
+    )
+
+
+class AppliedOperation(db.Model):
+    """Keys of replayed offline operations, so a resent one is not applied twice"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('uq_applied_operation_user_key', 'user_id', 'key', unique=True),
+        db.Index('ix_applied_operation_created', 'created_at'),
+    )
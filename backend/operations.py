@@ -0,0 +1,28 @@
+# backend/operations.py
+from datetime import datetime, timedelta
+
+from models import db, AppliedOperation
+
+# Keys older than this are forgotten; queued operations are replayed
+# long before that
+KEY_RETENTION_DAYS = 14
+
+
+def is_applied(user_id, key):
+    return db.session.query(
+        AppliedOperation.query.filter_by(user_id=user_id, key=key).exists()
+    ).scalar()
+
+
+def mark_applied(user_id, key):
+    """Record key in the current transaction; the unique index rejects a racing copy"""
+    db.session.add(AppliedOperation(user_id=user_id, key=key))
+
+
+def prune_applied(days=KEY_RETENTION_DAYS):
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    count = AppliedOperation.query.filter(
+        AppliedOperation.created_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return count
@@ -0,0 +1,96 @@
+# backend/page_cache.py
+import gzip
+import hashlib
+import threading
+
+from flask import request, render_template, make_response
+
+
+class CachedPage:
+    def __init__(self, body, uptodate, styles_version):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = digest
+        self.gzip_etag = digest + '-gz'
+        self.uptodate = uptodate
+        self.styles_version = styles_version
+
+
+class PageCache:
+    """
+    Renders user-independent templates once per process and serves the
+    cached bytes (plain or gzip) with a strong ETag.
+    In debug mode, entries are re-rendered when the template file or the
+    CSS build they inline (page_styles) changes.
+    """
+
+    def __init__(self, app=None):
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['page_cache'] = self
+
+    def _is_stale(self, page):
+        if not self.app.debug and not self.app.config.get('TEMPLATES_AUTO_RELOAD'):
+            return False
+        if page.uptodate is not None and not page.uptodate():
+            return True
+        # The inlined critical CSS must match the hashes the CSP allows
+        return page.styles_version != self._styles_version()
+
+    def _styles_version(self):
+        styles = self.app.extensions.get('page_styles')
+        return styles.version() if styles is not None else None
+
+    def _render(self, template_name):
+        env = self.app.jinja_env
+        _, _, uptodate = env.loader.get_source(env, template_name)
+        styles_version = self._styles_version()
+        body = render_template(template_name).encode('utf-8')
+        return CachedPage(body, uptodate, styles_version)
+
+    def get(self, template_name):
+        page = self._pages.get(template_name)
+        if page is not None and not self._is_stale(page):
+            return page
+        with self._lock:
+            page = self._pages.get(template_name)
+            if page is None or self._is_stale(page):
+                page = self._render(template_name)
+                self._pages[template_name] = page
+        return page
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def serve(self, template_name):
+        if not self.app.config.get('PAGE_CACHE_ENABLED', True):
+            return render_template(template_name)
+
+        page = self.get(template_name)
+        use_gzip = 'gzip' in request.accept_encodings
+        etag = page.gzip_etag if use_gzip else page.etag
+
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(page.gzip_body if use_gzip else page.body)
+            response.content_type = 'text/html; charset=utf-8'
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        # Pages sit behind login, so only the browser may keep them
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+page_cache = PageCache()
@@ -0,0 +1,112 @@
+# backend/page_styles.py
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+from markupsafe import Markup
+
+FULL_STYLESHEET = '<link rel="stylesheet" href="/static/css/style.css">'
+
+PageCSS = namedtuple('PageCSS', 'critical deferred_href csp_source')
+
+
+class PageStyles:
+    """
+    Serves the per-page CSS written by build_css.py: the page's critical
+    rules inline in <head>, the rest as a stylesheet after the markup.
+    Templates call critical_css() and deferred_css() with their own name.
+    Falls back to the full style.css when the build is missing or older
+    than style.css, so an unbuilt checkout still renders correctly.
+    """
+
+    def __init__(self, app=None):
+        self._pages = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.css_dir = os.path.join(app.static_folder, 'css')
+        app.extensions['page_styles'] = self
+        app.context_processor(lambda: {
+            'critical_css': self.critical_css,
+            'deferred_css': self.deferred_css,
+        })
+
+    def _files(self):
+        return (os.path.join(self.css_dir, 'style.css'),
+                os.path.join(self.css_dir, 'pages', 'manifest.json'))
+
+    def _current_stamp(self):
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None
+                     for path in self._files())
+
+    def _load(self):
+        source_path, manifest_path = self._files()
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(source_path, 'rb') as f:
+            source_digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        if manifest.get('source') != source_digest:
+            print("[CSS] ⚠ frontend/css/pages is older than style.css — "
+                  "serving style.css; run: python build_css.py")
+            return {}
+
+        pages = {}
+        for template, entry in manifest['pages'].items():
+            with open(os.path.join(self.css_dir, 'pages', entry['critical']),
+                      encoding='utf-8') as f:
+                critical = f.read()
+            digest = hashlib.sha256(critical.encode('utf-8')).digest()
+            pages[template] = PageCSS(
+                critical=critical,
+                deferred_href=f"/static/css/pages/{entry['deferred']}?v={entry['version']}",
+                csp_source=f"'sha256-{base64.b64encode(digest).decode('ascii')}'",
+            )
+        return pages
+
+    def _get_pages(self):
+        if not self.app.config.get('PAGE_STYLES_ENABLED', True):
+            return {}
+        # In debug mode, pick up a rebuild or an edit to style.css
+        reload = self.app.debug or self.app.config.get('TEMPLATES_AUTO_RELOAD')
+        if self._pages is not None and not (reload and self._stamp != self._current_stamp()):
+            return self._pages
+        with self._lock:
+            stamp = self._current_stamp()
+            if self._pages is None or self._stamp != stamp:
+                self._pages = self._load()
+                self._stamp = stamp
+        return self._pages
+
+    def version(self):
+        """Changes whenever the served build does; part of cached pages' keys"""
+        self._get_pages()
+        return self._stamp
+
+    def critical_css(self, template_name):
+        page = self._get_pages().get(template_name)
+        if page is None:
+            return Markup(FULL_STYLESHEET)
+        return Markup(f'<style>{page.critical}</style>')
+
+    def deferred_css(self, template_name):
+        page = self._get_pages().get(template_name)
+        if page is None:
+            return Markup('')
+        return Markup(f'<link rel="stylesheet" href="{page.deferred_href}">')
+
+    def csp_sources(self):
+        """Hashes allowing the inline critical CSS under style-src"""
+        return ' '.join(page.csp_source for page in self._get_pages().values())
+
+
+page_styles = PageStyles()
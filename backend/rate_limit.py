@@ -0,0 +1,208 @@
+# backend/rate_limit.py
+import functools
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from flask import request, session, jsonify, flash, render_template, current_app
+
+
+# ============ STORES ============
+# Each bucket records when it will be full again (full_at), computed from
+# its own scope's capacity and refill rate. A bucket past full_at is the
+# same as a missing one, so stores can drop it without knowing its scope.
+
+# The SQLite store deletes refilled buckets at most this often per connection
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def _refill(bucket, capacity, refill_per_second, now):
+    """Take one token from bucket (tokens, updated) or a new full one"""
+    tokens, updated = bucket if bucket else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    full_at = now + (capacity - tokens) / refill_per_second
+    return allowed, tokens, full_at
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process only"""
+
+    def __init__(self, max_keys=100000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def take(self, key, capacity, refill_per_second, now=None):
+        """Consume one token; return (allowed, seconds until next token)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            allowed, tokens, full_at = _refill(
+                bucket and bucket[:2], capacity, refill_per_second, now)
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now, full_at)
+        return allowed, _retry_after(tokens, refill_per_second)
+
+    def _prune(self, now):
+        # Buckets that are full again carry no state worth keeping
+        for key, (_, _, full_at) in list(self._buckets.items()):
+            if full_at <= now:
+                del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file shared by all gunicorn workers"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS token_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, '
+                'full_at REAL NOT NULL)')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_token_buckets_full_at '
+                'ON token_buckets (full_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.swept_at = 0
+        return conn
+
+    def take(self, key, capacity, refill_per_second, now=None):
+        now = time.time() if now is None else now
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT tokens, updated FROM token_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            allowed, tokens, full_at = _refill(row, capacity, refill_per_second, now)
+            conn.execute(
+                'INSERT OR REPLACE INTO token_buckets (key, tokens, updated, full_at) '
+                'VALUES (?, ?, ?, ?)', (key, tokens, now, full_at))
+            if now - self._local.swept_at >= SWEEP_INTERVAL_SECONDS:
+                # Keys are attacker-chosen usernames; don't keep them forever
+                conn.execute('DELETE FROM token_buckets WHERE full_at <= ?', (now,))
+                self._local.swept_at = now
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            # Never lock users out because the limiter itself is broken
+            print(f"[RATE LIMIT] Store error, allowing request: {e}")
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            return True, 0
+        return allowed, _retry_after(tokens, refill_per_second)
+
+
+def _retry_after(tokens, refill_per_second):
+    if tokens >= 1:
+        return 0
+    return math.ceil((1 - tokens) / refill_per_second)
+
+
+def create_store(uri):
+    """'memory://' or 'sqlite:////absolute/path.db'"""
+    if not uri or uri == 'memory://':
+        return MemoryBucketStore()
+    if uri.startswith('sqlite:///'):
+        return SQLiteBucketStore(uri[len('sqlite:///'):])
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URI: {uri}")
+
+
+# ============ LIMITER ============
+
+def client_ip():
+    """Client address, skipping the configured number of trusted proxies"""
+    proxies = current_app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+    route = request.access_route
+    if proxies and 'X-Forwarded-For' in request.headers and route:
+        return route[-proxies] if len(route) >= proxies else route[0]
+    return request.remote_addr or 'unknown'
+
+
+def submitted_name():
+    data = request.get_json(silent=True) if request.is_json else request.form
+    name = (data or {}).get('name', '')
+    return str(name).strip().lower()
+
+
+def pending_verification():
+    """The account awaiting an email code in this session"""
+    return str(session.get('verify_user_id') or '')
+
+
+class RateLimiter:
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.store = create_store(app.config.get('RATE_LIMIT_STORAGE_URI'))
+        app.extensions['rate_limiter'] = self
+
+    def check(self, scope, key, limit):
+        capacity, per_seconds = limit
+        return self.store.take(f'{scope}:{key}', capacity, capacity / per_seconds)
+
+    def limit(self, scope, template, user_key=submitted_name):
+        """
+        Limit POSTs to a view per client IP and per account, which
+        user_key() names (the submitted username by default).
+        Config keys RATE_LIMIT_<SCOPE>_IP / _USER hold (capacity, per_seconds).
+        Rejected requests never reach the view, so no hashing or queries run.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                config = current_app.config
+                if request.method != 'POST' or not config.get('RATE_LIMIT_ENABLED', True):
+                    return view(*args, **kwargs)
+
+                checks = [('ip', client_ip(), config[f'RATE_LIMIT_{scope.upper()}_IP'])]
+                name = user_key()
+                if name:
+                    checks.append(
+                        ('user', name, config[f'RATE_LIMIT_{scope.upper()}_USER']))
+
+                for kind, key, limit in checks:
+                    allowed, retry_after = self.check(f'{scope}:{kind}', key, limit)
+                    if not allowed:
+                        return self._reject(template, retry_after)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _reject(self, template, retry_after):
+        msg = 'Too many attempts. Please try again later.'
+        if request.is_json:
+            response = jsonify({'success': False, 'message': msg})
+        else:
+            flash(msg, 'error')
+            response = current_app.make_response(render_template(template))
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(retry_after, 1))
+        return response
+
+
+limiter = RateLimiter()
@@ -0,0 +1,111 @@
+# backend/replicas.py
+import functools
+import random
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_PREFIX = 'replica_'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# bind key -> time until which the replica is skipped after a failure
+_down_until = {}
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the replica chosen for the current request (if any).
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            key = g.get('replica_bind') if has_app_context() else None
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def get_replica_keys():
+    binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+    return [key for key in binds if key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def pick_replica():
+    now = time.time()
+    healthy = [key for key in get_replica_keys()
+               if _down_until.get(key, 0) <= now]
+    if not healthy:
+        return None
+    return random.choice(healthy)
+
+
+def mark_replica_down(key):
+    retry = current_app.config.get('REPLICA_RETRY_SECONDS', 30)
+    _down_until[key] = time.time() + retry
+    print(f"[REPLICA] {key} failed — using primary for {retry}s")
+
+
+def is_sticky():
+    """True if this browser session wrote recently and must read its own writes"""
+    last_write = session.get('_last_write_at')
+    if not last_write:
+        return False
+    window = current_app.config.get('REPLICA_STICKY_SECONDS', 10)
+    return time.time() - last_write < window
+
+
+def replica_allowed():
+    if not has_request_context() or request.method not in SAFE_METHODS:
+        return False
+    if g.get('replica_bind') is not None:
+        return False
+    return not is_sticky()
+
+
+@contextmanager
+def using_replica(key):
+    g.replica_bind = key
+    try:
+        yield
+    finally:
+        g.replica_bind = None
+
+
+def run_on_replica(func, *args, **kwargs):
+    """
+    Run func with reads routed to a replica when it is safe to do so.
+    If the replica fails, it is marked down and func is re-run on the primary.
+    """
+    key = pick_replica() if replica_allowed() else None
+    if key is None:
+        return func(*args, **kwargs)
+
+    db = current_app.extensions['sqlalchemy']
+    try:
+        with using_replica(key):
+            return func(*args, **kwargs)
+    except OperationalError:
+        db.session.rollback()
+        mark_replica_down(key)
+        return func(*args, **kwargs)
+
+
+def replica_read(view):
+    """Decorator for read-only views that may be served from a replica"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        return run_on_replica(view, *args, **kwargs)
+    return wrapper
+
+
+def remember_write(response):
+    """after_request hook: pin this session to the primary after a mutation"""
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        if get_replica_keys():
+            session['_last_write_at'] = time.time()
+    return response
@@ -0,0 +1,110 @@
+# backend/single_flight.py
+import threading
+import time
+
+
+class Flight:
+    """One in-progress call; followers wait on done and share its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls within one process: the first
+    caller for a key runs the function, callers arriving while it runs wait
+    and get the same result (or exception). Nothing is kept once the call
+    finishes, so this never serves data older than an in-flight query.
+
+    Keys carry a per-user data version, bumped after each successful write
+    this process handles, so within one process a read that starts after a
+    write never joins a flight started before it. Writes handled by other
+    workers are not seen: such a read may share a flight already running,
+    which is no staler than a read that raced the write.
+
+    Versions only matter while a user has a flight open, so they are kept
+    for those users only and dropped when their last flight lands.
+    """
+
+    def __init__(self, app=None):
+        self._flights = {}
+        # user id -> (flights in progress, data version)
+        self._users = {}
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'hits': 0, 'timeouts': 0, 'waiting': 0, 'wait_ms': 0.0}
+        self.enabled = True
+        self.wait_seconds = 10
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SINGLE_FLIGHT_ENABLED', True)
+        self.wait_seconds = app.config.get('SINGLE_FLIGHT_WAIT_SECONDS', 10)
+        app.extensions['single_flight'] = self
+
+    def bump(self, user_id):
+        """Called after a write; with no flight open there is nothing to split from"""
+        with self._lock:
+            if user_id in self._users:
+                active, version = self._users[user_id]
+                self._users[user_id] = (active, version + 1)
+
+    def do(self, user_id, key, func):
+        if not self.enabled:
+            return func()
+
+        with self._lock:
+            self._counters['calls'] += 1
+            active, version = self._users.get(user_id, (0, 0))
+            key = (user_id, version) + key
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+                self._users[user_id] = (active + 1, version)
+            else:
+                self._counters['hits'] += 1
+                self._counters['waiting'] += 1
+
+        if leader:
+            try:
+                flight.result = func()
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                    active, version = self._users[user_id]
+                    if active > 1:
+                        self._users[user_id] = (active - 1, version)
+                    else:
+                        del self._users[user_id]
+                flight.done.set()
+            return flight.result
+
+        start = time.monotonic()
+        finished = flight.done.wait(self.wait_seconds)
+        with self._lock:
+            self._counters['waiting'] -= 1
+            self._counters['wait_ms'] += (time.monotonic() - start) * 1000
+            if not finished:
+                self._counters['timeouts'] += 1
+        if not finished:
+            # The leader is stuck; don't hold this request hostage to it
+            return func()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, in_flight=len(self._flights))
+        stats['wait_ms'] = round(stats['wait_ms'], 1)
+        return stats
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,124 @@
+# backend/suggestions.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, delete, insert
+
+from models import db, ItemEvent, ReorderSuggestion
+
+USER_CHUNK_SIZE = 1000
+# Re-procuring within this many seconds is a correction, not a purchase
+MIN_INTERVAL_SECONDS = 6 * 3600
+# Intervals needed before an estimate is trusted
+MIN_SAMPLES = 2
+
+
+def estimate_intervals(codes, timestamps):
+    """
+    Given events sorted by (group code, timestamp), return per-group
+    (mean interval in seconds, interval count, last timestamp) as arrays,
+    computed without Python-level loops over events.
+    """
+    import numpy as np
+
+    n_groups = int(codes.max()) + 1 if codes.size else 0
+    diffs = np.diff(timestamps)
+    same_group = codes[1:] == codes[:-1]
+    valid = same_group & (diffs >= MIN_INTERVAL_SECONDS)
+
+    group_of_diff = codes[1:][valid]
+    sums = np.bincount(group_of_diff, weights=diffs[valid], minlength=n_groups)
+    counts = np.bincount(group_of_diff, minlength=n_groups)
+
+    last = np.zeros(n_groups)
+    # Events are sorted, so each group's last event ends its run of codes
+    if codes.size:
+        ends = np.append(np.flatnonzero(np.diff(codes)), codes.size - 1)
+        last[codes[ends]] = timestamps[ends]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+    return means, counts, last
+
+
+def _iter_user_chunks(chunk_size):
+    last_user_id = 0
+    while True:
+        user_ids = db.session.execute(
+            select(ItemEvent.user_id).distinct()
+            .where(ItemEvent.action == 'procured',
+                   ItemEvent.user_id > last_user_id)
+            .order_by(ItemEvent.user_id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+
+def _estimate_chunk(user_ids):
+    import numpy as np
+
+    rows = db.session.execute(
+        select(ItemEvent.user_id, ItemEvent.category, ItemEvent.name,
+               ItemEvent.created_at)
+        .where(ItemEvent.action == 'procured', ItemEvent.user_id.in_(user_ids))
+        .order_by(ItemEvent.user_id, ItemEvent.category, ItemEvent.name,
+                  ItemEvent.created_at)
+    ).all()
+    if not rows:
+        return []
+
+    # Group codes follow the sort order, so each new key starts a new code
+    keys = []
+    codes = np.empty(len(rows), dtype=np.int64)
+    timestamps = np.empty(len(rows), dtype=np.float64)
+    previous = None
+    for i, (user_id, category, name, created_at) in enumerate(rows):
+        key = (user_id, category, name)
+        if key != previous:
+            keys.append(key)
+            previous = key
+        codes[i] = len(keys) - 1
+        # created_at is naive UTC; a bare .timestamp() would read it as local time
+        timestamps[i] = created_at.replace(tzinfo=timezone.utc).timestamp()
+
+    means, counts, last = estimate_intervals(codes, timestamps)
+
+    suggestions = []
+    for index in np.flatnonzero(counts >= MIN_SAMPLES):
+        user_id, category, name = keys[index]
+        last_at = datetime.fromtimestamp(last[index], timezone.utc).replace(tzinfo=None)
+        interval = float(means[index])
+        suggestions.append({
+            'user_id': user_id,
+            'category': category,
+            'name': name,
+            'interval_days': interval / 86400,
+            'sample_count': int(counts[index]),
+            'last_procured_at': last_at,
+            'next_due_at': last_at + timedelta(seconds=interval),
+        })
+    return suggestions
+
+
+def estimate_reorders(chunk_size=USER_CHUNK_SIZE):
+    """
+    Recompute ReorderSuggestion for every user with procure history,
+    one chunk of users per transaction. Returns the number of rows written.
+    """
+    written = 0
+    for user_ids in _iter_user_chunks(chunk_size):
+        suggestions = _estimate_chunk(user_ids)
+        db.session.execute(
+            delete(ReorderSuggestion).where(ReorderSuggestion.user_id.in_(user_ids)))
+        if suggestions:
+            db.session.execute(insert(ReorderSuggestion), suggestions)
+        db.session.commit()
+        written += len(suggestions)
+    return written
+
+
+def get_suggestions(user_id):
+    return [s.to_dict() for s in ReorderSuggestion.query.filter_by(
+        user_id=user_id).order_by(ReorderSuggestion.next_due_at)]
@@ -0,0 +1,168 @@
+# backend/verification.py
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from auth import generate_verification_code
+
+
+# ============ STORES ============
+# Stores keep (digest, expires_at, attempts) per key. Digests are
+# compared with hmac.compare_digest, so checks take constant time.
+
+class MemoryCodeStore:
+    """Codes kept in this process; oldest entries are evicted first"""
+
+    def __init__(self, max_size=10000):
+        self._codes = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+
+    def put(self, key, digest, expires_at):
+        with self._lock:
+            self._codes.pop(key, None)
+            self._codes[key] = (digest, expires_at, 0)
+            self._evict(time.time())
+
+    def _evict(self, now):
+        # Entries share one TTL, so insertion order is expiry order
+        while self._codes:
+            oldest_key, (_, expires_at, _) = next(iter(self._codes.items()))
+            if expires_at > now and len(self._codes) <= self.max_size:
+                break
+            del self._codes[oldest_key]
+
+    def check(self, key, digest, max_attempts):
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is None:
+                return False
+            stored, expires_at, attempts = entry
+            if expires_at <= time.time() or attempts >= max_attempts:
+                del self._codes[key]
+                return False
+            if hmac.compare_digest(stored, digest):
+                del self._codes[key]
+                return True
+            self._codes[key] = (stored, expires_at, attempts + 1)
+            return False
+
+
+class SQLiteCodeStore:
+    """Codes in a local SQLite file shared by all gunicorn workers"""
+
+    def __init__(self, path, max_size=10000):
+        self.path = path
+        self.max_size = max_size
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS codes ('
+            'key TEXT PRIMARY KEY, digest TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)')
+        self._connect().execute(
+            'CREATE INDEX IF NOT EXISTS ix_codes_expires ON codes (expires_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, key, digest, expires_at):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM codes WHERE expires_at <= ?', (time.time(),))
+            conn.execute(
+                'INSERT OR REPLACE INTO codes (key, digest, expires_at, attempts) '
+                'VALUES (?, ?, ?, 0)', (key, digest, expires_at))
+            conn.execute(
+                'DELETE FROM codes WHERE key IN (SELECT key FROM codes '
+                'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)', (self.max_size,))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+    def check(self, key, digest, max_attempts):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT digest, expires_at, attempts FROM codes WHERE key = ?', (key,)
+            ).fetchone()
+            ok = False
+            if row is not None:
+                stored, expires_at, attempts = row
+                if expires_at <= time.time() or attempts >= max_attempts:
+                    conn.execute('DELETE FROM codes WHERE key = ?', (key,))
+                elif hmac.compare_digest(stored, digest):
+                    conn.execute('DELETE FROM codes WHERE key = ?', (key,))
+                    ok = True
+                else:
+                    conn.execute(
+                        'UPDATE codes SET attempts = attempts + 1 WHERE key = ?', (key,))
+            conn.execute('COMMIT')
+            return ok
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+
+def create_store(uri, max_size):
+    """'memory://' or 'sqlite:////absolute/path.db'"""
+    if not uri or uri == 'memory://':
+        return MemoryCodeStore(max_size)
+    if uri.startswith('sqlite:///'):
+        return SQLiteCodeStore(uri[len('sqlite:///'):], max_size)
+    raise ValueError(f"Unsupported VERIFICATION_STORE_URI: {uri}")
+
+
+# ============ CODES ============
+
+class VerificationCodes:
+    def __init__(self, app=None):
+        self.store = None
+        self.secret = b''
+        self.ttl = 600
+        self.max_attempts = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.store = create_store(
+            config.get('VERIFICATION_STORE_URI'),
+            config.get('VERIFICATION_STORE_MAX', 10000))
+        self.secret = config['SECRET_KEY'].encode('utf-8')
+        self.ttl = config.get('VERIFICATION_CODE_TTL', 600)
+        self.max_attempts = config.get('VERIFICATION_MAX_ATTEMPTS', 5)
+        app.extensions['verification_codes'] = self
+
+    def _digest(self, key, code):
+        message = f'{key}:{code}'.encode('utf-8')
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def issue(self, key):
+        """Create a new code for key, replacing any earlier one"""
+        code = generate_verification_code()
+        self.store.put(str(key), self._digest(key, code), time.time() + self.ttl)
+        return code
+
+    def check(self, key, code):
+        """True once for a matching, unexpired code; wrong guesses count as attempts"""
+        if not code:
+            return False
+        return self.store.check(str(key), self._digest(key, code), self.max_attempts)
+
+
+verification_codes = VerificationCodes()
@@ -0,0 +1,331 @@
+# build_css.py
+# Location: Home Needs/build_css.py
+# Run: python build_css.py           (write frontend/css/pages/ and print the size report)
+#      python build_css.py --check   (exit 1 if the built files are out of date)
+#
+# Splits frontend/css/style.css per template in frontend/pages:
+#   <page>.critical.css  rules for markup visible when the page loads;
+#                        inlined into a <style> block in <head>
+#   <page>.css           rules only reached by hidden markup or by classes
+#                        the page's scripts add later; linked at the end of
+#                        <body>, so it never blocks the first paint
+# A rule is kept when every class, id and element in one of its selectors
+# appears in the page (or in app.js, for pages that load it). Pseudo-classes
+# and attribute selectors are not checked, so theme variables always stay.
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from html.parser import HTMLParser
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGES_DIR = os.path.join(ROOT, 'frontend', 'pages')
+SOURCE_CSS = os.path.join(ROOT, 'frontend', 'css', 'style.css')
+OUTPUT_DIR = os.path.join(ROOT, 'frontend', 'css', 'pages')
+APP_JS = os.path.join(ROOT, 'frontend', 'js', 'app.js')
+APP_JS_SRC = '/static/js/app.js'
+MANIFEST = 'manifest.json'
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'source', 'track', 'wbr'}
+ALWAYS_TAGS = {'html', 'body', '*'}
+
+
+# ============ CSS PARSING ============
+
+class Rule:
+    """A style rule, or an at-rule with nested rules (children) or a raw body"""
+
+    def __init__(self, prelude, body=None, children=None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+
+def parse_css(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    rules, _ = _parse_block(text, 0)
+    return rules
+
+
+def _parse_block(text, pos):
+    rules = []
+    while True:
+        start = pos
+        while pos < len(text) and text[pos] not in '{};':
+            pos += 1
+        if pos >= len(text) or text[pos] == '}':
+            return rules, pos + 1
+        prelude = ' '.join(text[start:pos].split())
+        if text[pos] == ';':  # @import / @charset
+            rules.append(Rule(prelude))
+            pos += 1
+            continue
+        if prelude.startswith('@media') or prelude.startswith('@supports'):
+            children, pos = _parse_block(text, pos + 1)
+            rules.append(Rule(prelude, children=children))
+            continue
+        end = _matching_brace(text, pos)
+        rules.append(Rule(prelude, body=text[pos + 1:end]))
+        pos = end + 1
+
+
+def _matching_brace(text, pos):
+    depth = 0
+    for i in range(pos, len(text)):
+        if text[i] == '{':
+            depth += 1
+        elif text[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError('Unbalanced braces in style.css')
+
+
+def minify_body(body):
+    body = ' '.join(body.split())
+    body = re.sub(r'\s*([{}:;,])\s*', r'\1', body)
+    return body.replace(';}', '}').rstrip(';')
+
+
+def split_selectors(prelude):
+    parts, depth, current = [], 0, ''
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    parts.append(current.strip())
+    return [part for part in parts if part]
+
+
+# ============ PAGE USAGE ============
+
+class PageScanner(HTMLParser):
+    """
+    Collects the classes, ids and tags in a template. Elements under
+    style="display:none" or [hidden] count as hidden: their rules are
+    needed later, not for the first paint.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.visible = set()
+        self.hidden = set()
+        self.scripts = []
+        self._stack = []
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script':
+            self._in_script = True
+            if attrs.get('src'):
+                self.scripts.append(attrs['src'])
+            return
+        style = (attrs.get('style') or '').replace(' ', '')
+        hidden = (self._stack and self._stack[-1]) or 'display:none' in style or 'hidden' in attrs
+        tokens = {tag}
+        tokens.update('.' + name for name in (attrs.get('class') or '').split())
+        if attrs.get('id'):
+            tokens.add('#' + attrs['id'])
+        (self.hidden if hidden else self.visible).update(tokens)
+        if tag not in VOID_TAGS:
+            self._stack.append(hidden)
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self._in_script = False
+        elif tag not in VOID_TAGS and self._stack:
+            self._stack.pop()
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.scripts.append(data)
+
+
+def script_tokens(source):
+    """Every class, id and tag a script might produce, over-approximated"""
+    tokens = set()
+    for literal in re.findall(r"'([^'\n]*)'|\"([^\"\n]*)\"", source):
+        for word in re.findall(r'[A-Za-z_][\w-]*', literal[0] or literal[1]):
+            tokens.update(('.' + word, '#' + word, word.lower()))
+    return tokens
+
+
+def scan_page(path, app_js):
+    with open(path, encoding='utf-8') as f:
+        scanner = PageScanner()
+        scanner.feed(f.read())
+    later = set(scanner.hidden)
+    for script in scanner.scripts:
+        later |= script_tokens(app_js if script == APP_JS_SRC else script)
+    visible = scanner.visible | ALWAYS_TAGS
+    return visible, visible | later
+
+
+# ============ SPLITTING ============
+
+def selector_used(selector, tokens):
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    selector = re.sub(r'::?[\w-]+(\([^()]*\))?', '', selector)
+    for compound in re.split(r'[\s>+~]+', selector):
+        if not compound:
+            continue
+        tag = re.match(r'[A-Za-z][\w-]*|\*', compound)
+        if tag and tag.group(0).lower() not in tokens:
+            return False
+        for name in re.findall(r'[.#][\w-]+', compound):
+            if name not in tokens:
+                return False
+    return True
+
+
+def split_rules(rules, critical_tokens, page_tokens):
+    """Return (critical, deferred) rule text and the animations each uses"""
+    critical, deferred = [], []
+    animations = (set(), set())
+    keyframes = {}
+
+    for rule in rules:
+        if rule.children is not None:
+            inner_critical, inner_deferred, inner_frames, used = split_rules(
+                rule.children, critical_tokens, page_tokens)
+            keyframes.update(inner_frames)
+            for out, inner, names, inner_names in (
+                    (critical, inner_critical, animations[0], used[0]),
+                    (deferred, inner_deferred, animations[1], used[1])):
+                if inner:
+                    out.append(f"{rule.prelude}{{{''.join(inner)}}}")
+                names.update(inner_names)
+        elif rule.prelude.startswith('@keyframes'):
+            keyframes[rule.prelude.split()[1]] = (
+                f"{rule.prelude}{{{minify_body(rule.body)}}}")
+        elif rule.prelude.startswith('@') or rule.body is None:
+            body = '' if rule.body is None else f"{{{minify_body(rule.body)}}}"
+            critical.append(rule.prelude + (body or ';'))
+        else:
+            body = minify_body(rule.body)
+            selectors = split_selectors(rule.prelude)
+            now = [s for s in selectors if selector_used(s, critical_tokens)]
+            later = [s for s in selectors
+                     if s not in now and selector_used(s, page_tokens)]
+            for out, chosen, names in ((critical, now, animations[0]),
+                                       (deferred, later, animations[1])):
+                if chosen:
+                    out.append(f"{','.join(chosen)}{{{body}}}")
+                    names.update(animation_names(body))
+
+    return critical, deferred, keyframes, animations
+
+
+def animation_names(body):
+    values = re.findall(r'animation(?:-name)?:([^;]+)', body)
+    return {word for value in values for word in re.findall(r'[\w-]+', value)}
+
+
+def build_page(rules, critical_tokens, page_tokens):
+    critical, deferred, keyframes, (now, later) = split_rules(
+        rules, critical_tokens, page_tokens)
+    # Keyframes go wherever their first user is; critical CSS loads first
+    critical += [keyframes[name] for name in keyframes if name in now]
+    deferred += [keyframes[name] for name in keyframes
+                 if name in later and name not in now]
+    return '\n'.join(critical) + '\n', '\n'.join(deferred) + '\n'
+
+
+# ============ BUILD ============
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def build():
+    """Return {filename: bytes} for OUTPUT_DIR, manifest included"""
+    with open(SOURCE_CSS, 'rb') as f:
+        source = f.read()
+    with open(APP_JS, encoding='utf-8') as f:
+        app_js = f.read()
+    rules = parse_css(source.decode('utf-8'))
+
+    outputs = {}
+    pages = {}
+    for template in sorted(os.listdir(PAGES_DIR)):
+        if not template.endswith('.html'):
+            continue
+        stem = template[:-len('.html')]
+        visible, used = scan_page(os.path.join(PAGES_DIR, template), app_js)
+        critical, deferred = build_page(rules, visible, used)
+        critical_file, deferred_file = f'{stem}.critical.css', f'{stem}.css'
+        outputs[critical_file] = critical.encode('utf-8')
+        outputs[deferred_file] = deferred.encode('utf-8')
+        pages[template] = {
+            'critical': critical_file,
+            'deferred': deferred_file,
+            'version': digest(outputs[deferred_file])[:8],
+        }
+
+    manifest = {'source': digest(source), 'pages': pages}
+    outputs[MANIFEST] = (json.dumps(manifest, indent=2) + '\n').encode('utf-8')
+    return source, outputs
+
+
+def is_current(outputs):
+    for name, data in outputs.items():
+        path = os.path.join(OUTPUT_DIR, name)
+        if not os.path.exists(path):
+            return False
+        with open(path, 'rb') as f:
+            if f.read() != data:
+                return False
+    return True
+
+
+def gz(data):
+    return len(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def report(source, outputs):
+    manifest = json.loads(outputs[MANIFEST])
+    print(f"\n  {'page':24s} {'before':>15s} {'inline critical':>17s} {'deferred':>15s}")
+    print(f"  {'':24s} {'bytes   gzip':>15s} {'bytes   gzip':>17s} {'bytes   gzip':>15s}")
+    for template, entry in manifest['pages'].items():
+        critical = outputs[entry['critical']]
+        deferred = outputs[entry['deferred']]
+        print(f"  {template:24s} {len(source):7d} {gz(source):6d}"
+              f" {len(critical):9d} {gz(critical):6d}"
+              f" {len(deferred):8d} {gz(deferred):6d}")
+    print("\n  before: style.css, one render-blocking request per page")
+    print("  after:  critical CSS inline (no request), the rest loaded after the markup\n")
+
+
+def main():
+    source, outputs = build()
+    if '--check' in sys.argv:
+        if not is_current(outputs):
+            print("❌ frontend/css/pages is out of date — run: python build_css.py")
+            sys.exit(1)
+        print("✓ frontend/css/pages is up to date")
+        return
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for name in os.listdir(OUTPUT_DIR):
+        if name not in outputs:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+    for name, data in outputs.items():
+        with open(os.path.join(OUTPUT_DIR, name), 'wb') as f:
+            f.write(data)
+    print(f"✓ Wrote {len(outputs)} files to frontend/css/pages")
+    report(source, outputs)
+
+
+if __name__ == '__main__':
+    main()
@@ -46,6 +46,7 @@ document.addEventListener('DOMContentLoaded', loadTheme);
 // GLOBAL VARIABLES
 // ============================================
 let currentItems = [];
+let currentCategory = null;
 let undoTimeout = null;
 let touchStartX = 0;
 let touchCurrentX = 0;
@@ -55,13 +56,15 @@ const SWIPE_THRESHOLD = 80;
 // ============================================
 // API HELPER
 // ============================================
-async function apiCall(url, method, body) {
+async function apiCall(url, method, body, keepalive) {
     method = method || 'GET';
     body = body || null;
 
     const options = {
         method: method,
-        headers: { 'Content-Type': 'application/json' }
+        headers: { 'Content-Type': 'application/json' },
+        // keepalive lets a write finish while the page is unloading
+        keepalive: !!keepalive
     };
     if (body) {
         options.body = JSON.stringify(body);
@@ -97,7 +100,10 @@ async function addNewItem(category) {
 
     const result = await apiCall('/api/items', 'POST', { name: name, category: category });
 
-    if (result && result.success) {
+    if (result && result.queued) {
+        input.value = '';
+        showMiniToast('"' + name + '" will be added when you are back online');
+    } else if (result && result.success) {
         input.value = '';
         const currentPage = getCurrentPage();
         if (currentPage === 'procure') {
@@ -135,65 +141,261 @@ function getCurrentPage() {
     return 'dashboard';
 }
 
+// ============================================
+// LIST RENDERING (batched + virtualized)
+// ============================================
+// Short lists are built off-DOM and inserted once. Lists longer than
+// VIRTUALIZE_THRESHOLD only keep the rows near the viewport in the DOM,
+// with spacers standing in for the rest.
+var VIRTUALIZE_THRESHOLD = 150;
+var VIRTUAL_OVERSCAN = 10;
+var DEFAULT_ROW_HEIGHTS = { header: 44, item: 56 };
+var activeVirtualList = null;
+
+function htmlToElement(html) {
+    var template = document.createElement('template');
+    template.innerHTML = html;
+    return template.content.firstElementChild;
+}
+
+function VirtualList(container, rows, renderRow) {
+    this.container = container;
+    this.renderRow = renderRow;
+    this.heights = {};
+    this.elements = {};
+    this.start = -1;
+    this.end = -1;
+    this.topSpacer = document.createElement('div');
+    this.bottomSpacer = document.createElement('div');
+    this.topSpacer.className = 'virtual-spacer';
+    this.bottomSpacer.className = 'virtual-spacer';
+
+    var gap = parseFloat(window.getComputedStyle(container).rowGap);
+    this.gap = isNaN(gap) ? 8 : gap;
+
+    var self = this;
+    var scheduled = false;
+    this.onScroll = function() {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(function() {
+            scheduled = false;
+            self.update();
+        });
+    };
+    window.addEventListener('scroll', this.onScroll, { passive: true });
+    window.addEventListener('resize', this.onScroll);
+
+    this.setRows(rows);
+}
+
+VirtualList.prototype.rowHeight = function(row) {
+    return (this.heights[row.kind] || DEFAULT_ROW_HEIGHTS[row.kind] || 56) + this.gap;
+};
+
+VirtualList.prototype.computeOffsets = function() {
+    this.offsets = new Array(this.rows.length + 1);
+    this.offsets[0] = 0;
+    for (var i = 0; i < this.rows.length; i++) {
+        this.offsets[i + 1] = this.offsets[i] + this.rowHeight(this.rows[i]);
+    }
+};
+
+VirtualList.prototype.setRows = function(rows) {
+    this.rows = rows;
+    this.elements = {};
+    this.start = -1;
+    this.end = -1;
+    this.computeOffsets();
+    this.container.innerHTML = '';
+    this.container.appendChild(this.topSpacer);
+    this.container.appendChild(this.bottomSpacer);
+    this.update();
+};
+
+// Index of the first row whose bottom edge is below y
+VirtualList.prototype.indexAt = function(y) {
+    var lo = 0;
+    var hi = this.rows.length;
+    while (lo < hi) {
+        var mid = (lo + hi) >> 1;
+        if (this.offsets[mid + 1] <= y) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+};
+
+VirtualList.prototype.update = function() {
+    var rect = this.container.getBoundingClientRect();
+    var viewTop = Math.max(0, -rect.top);
+    var viewBottom = viewTop + window.innerHeight;
+    var start = Math.max(0, this.indexAt(viewTop) - VIRTUAL_OVERSCAN);
+    var end = Math.min(this.rows.length, this.indexAt(viewBottom) + 1 + VIRTUAL_OVERSCAN);
+    if (start === this.start && end === this.end) return;
+
+    // Drop rows that left the window, build the ones that entered it
+    for (var key in this.elements) {
+        var index = +key;
+        if (index < start || index >= end) {
+            this.elements[key].remove();
+            delete this.elements[key];
+        }
+    }
+    var fragment = document.createDocumentFragment();
+    for (var i = start; i < end; i++) {
+        var el = this.elements[i] || this.renderRow(this.rows[i], i);
+        this.elements[i] = el;
+        fragment.appendChild(el);
+    }
+    this.container.insertBefore(fragment, this.bottomSpacer);
+    this.start = start;
+    this.end = end;
+
+    this.setSpacer(this.topSpacer, this.offsets[start]);
+    this.setSpacer(this.bottomSpacer, this.offsets[this.rows.length] - this.offsets[end]);
+    this.measure();
+};
+
+VirtualList.prototype.setSpacer = function(spacer, height) {
+    // A spacer stands in for rows including their gaps, minus its own gap
+    spacer.style.display = height > 0 ? 'block' : 'none';
+    spacer.style.height = Math.max(0, height - this.gap) + 'px';
+};
+
+// Learn real row heights per kind once rows are laid out
+VirtualList.prototype.measure = function() {
+    var changed = false;
+    for (var key in this.elements) {
+        var kind = this.rows[key].kind;
+        if (this.heights[kind]) continue;
+        var el = this.elements[key];
+        var style = window.getComputedStyle(el);
+        var height = el.offsetHeight + (parseFloat(style.marginTop) || 0) +
+            (parseFloat(style.marginBottom) || 0);
+        if (height > 0) {
+            this.heights[kind] = height;
+            changed = true;
+        }
+    }
+    if (changed) {
+        this.computeOffsets();
+        this.setSpacer(this.topSpacer, this.offsets[this.start]);
+        this.setSpacer(this.bottomSpacer, this.offsets[this.rows.length] - this.offsets[this.end]);
+    }
+};
+
+VirtualList.prototype.destroy = function() {
+    window.removeEventListener('scroll', this.onScroll);
+    window.removeEventListener('resize', this.onScroll);
+};
+
+function renderRows(container, rows, renderRow) {
+    if (activeVirtualList) {
+        activeVirtualList.destroy();
+        activeVirtualList = null;
+    }
+    if (rows.length > VIRTUALIZE_THRESHOLD) {
+        activeVirtualList = new VirtualList(container, rows, function(row, index) {
+            return renderRow(row, index, false);
+        });
+        return;
+    }
+    var fragment = document.createDocumentFragment();
+    rows.forEach(function(row, index) {
+        fragment.appendChild(renderRow(row, index, true));
+    });
+    container.innerHTML = '';
+    container.appendChild(fragment);
+}
+
+function showLoadingShimmer(container, count) {
+    if (activeVirtualList) {
+        activeVirtualList.destroy();
+        activeVirtualList = null;
+    }
+    container.innerHTML = new Array(count + 1).join('<div class="loading-shimmer"></div>');
+}
+
+function setListEmpty(isEmpty) {
+    var itemsList = document.getElementById('itemsList');
+    var emptyState = document.getElementById('emptyState');
+    if (itemsList) itemsList.style.display = isEmpty ? 'none' : 'flex';
+    if (emptyState) emptyState.style.display = isEmpty ? 'flex' : 'none';
+}
+
 // ============================================
 // LOAD PROCURE ITEMS (Pages 2 & 3)
 // ============================================
 async function loadProcureItems(category) {
     var itemsList = document.getElementById('itemsList');
-    var emptyState = document.getElementById('emptyState');
 
     if (!itemsList) return;
 
-    itemsList.innerHTML = '';
-    for (var i = 0; i < 4; i++) {
-        itemsList.innerHTML += '<div class="loading-shimmer"></div>';
-    }
+    showLoadingShimmer(itemsList, 4);
 
+    currentCategory = category;
     var items = await apiCall('/api/items/' + category);
     if (!items) return;
 
     currentItems = items;
+    renderProcureList(items);
+}
 
+function buildProcureRows(items) {
     var procureItems = items.filter(function(item) { return item.to_procure; });
     var activeItems = procureItems.filter(function(item) { return !item.consumed; });
     var consumedItems = procureItems.filter(function(item) { return item.consumed; });
+    var rows = [];
 
-    itemsList.innerHTML = '';
-
-    if (procureItems.length === 0) {
-        itemsList.style.display = 'none';
-        emptyState.style.display = 'flex';
-        return;
+    if (activeItems.length > 0) {
+        rows.push({ kind: 'header', section: 'active', title: 'Active Items', count: activeItems.length });
+        activeItems.forEach(function(item) { rows.push({ kind: 'item', item: item }); });
+    }
+    if (consumedItems.length > 0) {
+        rows.push({ kind: 'header', section: 'consumed', title: 'Consumed', count: consumedItems.length });
+        consumedItems.forEach(function(item) { rows.push({ kind: 'item', item: item }); });
     }
+    return rows;
+}
 
-    itemsList.style.display = 'flex';
-    emptyState.style.display = 'none';
+function renderProcureList(items) {
+    var itemsList = document.getElementById('itemsList');
+    var rows = buildProcureRows(items);
 
-    if (activeItems.length > 0) {
-        itemsList.innerHTML += '<div class="section-header"><h3>Active Items</h3><span class="section-count">' + activeItems.length + ' items</span></div>';
-        activeItems.forEach(function(item, index) {
-            itemsList.innerHTML += createProcureItemCard(item, false, index);
-        });
+    if (rows.length === 0) {
+        itemsList.innerHTML = '';
+        setListEmpty(true);
+        return;
     }
+    setListEmpty(false);
 
-    if (consumedItems.length > 0) {
-        itemsList.innerHTML += '<div class="section-header"><h3>Consumed</h3><span class="section-count">' + consumedItems.length + ' items</span></div>';
-        consumedItems.forEach(function(item, index) {
-            itemsList.innerHTML += createProcureItemCard(item, true, activeItems.length + index);
-        });
-    }
+    var cardIndex = 0;
+    renderRows(itemsList, rows, function(row, index, animate) {
+        if (row.kind === 'header') {
+            return createSectionHeader(row.section, row.title, row.count);
+        }
+        return htmlToElement(createProcureItemCard(
+            row.item, row.item.consumed, animate ? cardIndex++ : -1));
+    });
+}
+
+function createSectionHeader(section, title, count) {
+    return htmlToElement('<div class="section-header" data-section="' + section + '">' +
+        '<h3>' + title + '</h3><span class="section-count">' + count + ' items</span></div>');
 }
 
 function createProcureItemCard(item, isConsumed, index) {
+    // A negative index renders the card without the entrance animation
+    var animate = index >= 0;
     var delay = Math.min(index * 0.05, 0.3);
     var consumedClass = isConsumed ? 'consumed' : '';
     var iconClass = isConsumed ? 'fa-undo' : 'fa-check';
     var actionText = isConsumed ? 'Tap to restore' : 'Tap to consume';
 
-    return '<div class="item-card ' + consumedClass + ' animate-card" ' +
+    return '<div class="item-card ' + consumedClass + (animate ? ' animate-card' : '') + '" ' +
         'data-id="' + item.id + '" ' +
         'data-consumed="' + isConsumed + '" ' +
-        'style="animation-delay: ' + delay + 's" ' +
+        (animate ? 'style="animation-delay: ' + delay + 's" ' : '') +
         'onclick="toggleConsumed(' + item.id + ', \'' + item.category + '\')">' +
         '<div class="item-status-dot"></div>' +
         '<span class="item-name">' + escapeHtml(item.name) + '</span>' +
@@ -203,21 +405,191 @@ function createProcureItemCard(item, isConsumed, index) {
         '</div></div>';
 }
 
+// Move one procure card to its new section without rebuilding the list
+function placeProcureCard(item) {
+    var itemsList = document.getElementById('itemsList');
+    if (activeVirtualList) {
+        activeVirtualList.setRows(buildProcureRows(currentItems));
+        return;
+    }
+
+    var section = item.consumed ? 'consumed' : 'active';
+    var header = itemsList.querySelector('.section-header[data-section="' + section + '"]');
+    if (!header) {
+        header = createSectionHeader(section, item.consumed ? 'Consumed' : 'Active Items', 0);
+        // Active items always come first, consumed items last
+        itemsList.insertBefore(header, section === 'active' ? itemsList.firstChild : null);
+    }
+
+    var card = htmlToElement(createProcureItemCard(item, item.consumed, -1));
+    card.classList.add('slide-in');
+    var oldCard = itemsList.querySelector('.item-card[data-id="' + item.id + '"]');
+    if (oldCard) oldCard.remove();
+
+    // Cards are sorted by name within a section
+    var next = header.nextElementSibling;
+    while (next && next.classList.contains('item-card') &&
+           next.querySelector('.item-name').textContent.localeCompare(item.name) < 0) {
+        next = next.nextElementSibling;
+    }
+    itemsList.insertBefore(card, next);
+    updateSectionCounts(itemsList);
+}
+
+function updateSectionCounts(itemsList) {
+    var headers = itemsList.querySelectorAll('.section-header');
+    headers.forEach(function(header) {
+        var count = 0;
+        var node = header.nextElementSibling;
+        while (node && node.classList.contains('item-card')) {
+            count++;
+            node = node.nextElementSibling;
+        }
+        if (count === 0) {
+            header.remove();
+        } else {
+            header.querySelector('.section-count').textContent = count + ' items';
+        }
+    });
+}
+
+function findCurrentItem(itemId) {
+    itemId = canonicalId(itemId);
+    for (var i = 0; i < currentItems.length; i++) {
+        if (currentItems[i].id === itemId) return currentItems[i];
+    }
+    return null;
+}
+
 // ============================================
-// TOGGLE CONSUMED (Procure pages)
+// WRITE BUFFER (optimistic toggles)
 // ============================================
-async function toggleConsumed(itemId, category) {
-    var card = document.querySelector('.item-card[data-id="' + itemId + '"]');
-    if (card) {
-        card.classList.add('slide-out');
+// Taps update the page at once and only record the item's new state.
+// After WRITE_DEBOUNCE_MS without taps, every changed item is sent in one
+// PUT /api/items/state with explicit values, so repeated taps collapse
+// into the final state and a double tap sends nothing at all.
+var WRITE_DEBOUNCE_MS = 400;
+var pendingWrites = {};     // item id -> { item, base: last saved state }
+var writeTimer = null;
+var writeInFlight = false;
+var itemIdAliases = {};     // catalog item id -> id of the user's own row
+
+function canonicalId(itemId) {
+    return itemIdAliases[itemId] || itemId;
+}
+
+function queueItemState(item, state) {
+    if (!pendingWrites[item.id]) {
+        pendingWrites[item.id] = {
+            item: item,
+            base: { to_procure: item.to_procure, consumed: item.consumed }
+        };
+    }
+    item.to_procure = state.to_procure;
+    item.consumed = state.consumed;
+
+    clearTimeout(writeTimer);
+    writeTimer = setTimeout(flushWrites, WRITE_DEBOUNCE_MS);
+}
+
+async function flushWrites() {
+    clearTimeout(writeTimer);
+    writeTimer = null;
+    if (writeInFlight) {
+        // One batch at a time keeps rollbacks in order
+        writeTimer = setTimeout(flushWrites, WRITE_DEBOUNCE_MS);
+        return;
     }
 
-    await new Promise(function(resolve) { setTimeout(resolve, 300); });
+    var batch = [];
+    Object.keys(pendingWrites).forEach(function(key) {
+        var entry = pendingWrites[key];
+        var item = entry.item;
+        if (item.to_procure !== entry.base.to_procure || item.consumed !== entry.base.consumed) {
+            batch.push(entry);
+        }
+    });
+    pendingWrites = {};
+    if (batch.length === 0) return;
+
+    var states = batch.map(function(entry) {
+        return { id: entry.item.id, to_procure: entry.item.to_procure, consumed: entry.item.consumed };
+    });
+    writeInFlight = true;
+    var result = await apiCall('/api/items/state', 'PUT', { items: states }, true);
+    writeInFlight = false;
 
-    var result = await apiCall('/api/items/' + itemId + '/toggle-consumed', 'PUT');
     if (result && result.success) {
-        loadProcureItems(category);
+        // A write queued offline by the service worker has no saved items yet
+        batch.forEach(function(entry, i) {
+            var saved = result.items[states[i].id];
+            if (saved) remapItemId(entry.item, saved.id);
+        });
+        return;
+    }
+
+    // Back to the last saved state, unless a newer change is already queued
+    batch.forEach(function(entry) {
+        var newer = pendingWrites[entry.item.id];
+        if (newer) {
+            newer.base = entry.base;
+            return;
+        }
+        entry.item.to_procure = entry.base.to_procure;
+        entry.item.consumed = entry.base.consumed;
+        renderItemState(entry.item);
+    });
+    showMiniToast('Could not save changes', true);
+}
+
+// Shared catalog items get their own row (and id) on first write
+function remapItemId(item, newId) {
+    var oldId = item.id;
+    if (oldId === newId) return;
+    itemIdAliases[oldId] = newId;
+    item.id = newId;
+    if (pendingWrites[oldId]) {
+        pendingWrites[newId] = pendingWrites[oldId];
+        delete pendingWrites[oldId];
+    }
+    document.querySelectorAll('[data-id="' + oldId + '"]').forEach(function(el) {
+        el.setAttribute('data-id', newId);
+    });
+}
+
+function renderItemState(item) {
+    if (getCurrentPage() === 'procure') {
+        placeProcureCard(item);
+        return;
+    }
+    var wrapper = document.querySelector('.item-checkbox-wrapper[data-id="' + item.id + '"]');
+    if (wrapper) {
+        wrapper.classList.toggle('checked', item.to_procure);
+        wrapper.querySelector('input[type="checkbox"]').checked = item.to_procure;
+    }
+}
+
+// Send buffered changes before the page goes away
+document.addEventListener('visibilitychange', function () {
+    if (document.visibilityState === 'hidden') {
+        flushWrites();
+    }
+});
+
+// ============================================
+// TOGGLE CONSUMED (Procure pages)
+// ============================================
+function toggleConsumed(itemId, category) {
+    var item = findCurrentItem(itemId);
+    if (!item) return;
+
+    queueItemState(item, { to_procure: item.to_procure, consumed: !item.consumed });
+
+    var card = document.querySelector('.item-card[data-id="' + item.id + '"]');
+    if (card) {
+        card.classList.add('slide-out');
     }
+    setTimeout(function() { placeProcureCard(item); }, 300);
 }
 
 // ============================================
@@ -225,15 +597,12 @@ async function toggleConsumed(itemId, category) {
 // ============================================
 async function loadFullList(category) {
     var itemsList = document.getElementById('itemsList');
-    var emptyState = document.getElementById('emptyState');
 
     if (!itemsList) return;
 
-    itemsList.innerHTML = '';
-    for (var i = 0; i < 6; i++) {
-        itemsList.innerHTML += '<div class="loading-shimmer"></div>';
-    }
+    showLoadingShimmer(itemsList, 6);
 
+    currentCategory = category;
     var items = await apiCall('/api/items/' + category);
     if (!items) return;
 
@@ -243,59 +612,61 @@ async function loadFullList(category) {
 
 function renderFullList(items) {
     var itemsList = document.getElementById('itemsList');
-    var emptyState = document.getElementById('emptyState');
-
-    itemsList.innerHTML = '';
 
     if (items.length === 0) {
-        itemsList.style.display = 'none';
-        emptyState.style.display = 'flex';
+        itemsList.innerHTML = '';
+        setListEmpty(true);
         return;
     }
+    setListEmpty(false);
 
-    itemsList.style.display = 'flex';
-    emptyState.style.display = 'none';
-
-    items.forEach(function(item, index) {
-        var delay = Math.min(index * 0.03, 0.5);
-        var itemEl = document.createElement('div');
-        var checkedClass = item.to_procure ? 'checked' : '';
-        var checkedAttr = item.to_procure ? 'checked' : '';
-
-        itemEl.className = 'item-checkbox-wrapper ' + checkedClass + ' animate-card';
-        itemEl.style.animationDelay = delay + 's';
-        itemEl.setAttribute('data-id', item.id);
-        itemEl.setAttribute('data-name', item.name.toLowerCase());
+    var rows = items.map(function(item) { return { kind: 'item', item: item }; });
+    renderRows(itemsList, rows, function(row, index, animate) {
+        return createFullListItem(row.item, animate ? index : -1);
+    });
+}
 
-        itemEl.innerHTML = '<div class="swipe-delete-bg"><i class="fas fa-trash-alt"></i></div>' +
-            '<label class="custom-checkbox">' +
-            '<input type="checkbox" ' + checkedAttr + ' onchange="toggleProcure(' + item.id + ', \'' + item.category + '\', this)">' +
-            '<span class="checkmark"></span>' +
-            '</label>' +
-            '<span class="checkbox-item-name">' + escapeHtml(item.name) + '</span>';
+function createFullListItem(item, index) {
+    var itemEl = document.createElement('div');
+    var checkedClass = item.to_procure ? 'checked' : '';
+    var checkedAttr = item.to_procure ? 'checked' : '';
 
-        setupSwipeToDelete(itemEl, item);
-        itemsList.appendChild(itemEl);
-    });
+    itemEl.className = 'item-checkbox-wrapper ' + checkedClass;
+    if (index >= 0) {
+        itemEl.classList.add('animate-card');
+        itemEl.style.animationDelay = Math.min(index * 0.03, 0.5) + 's';
+    }
+    itemEl.setAttribute('data-id', item.id);
+    itemEl.setAttribute('data-name', item.name.toLowerCase());
+
+    itemEl.innerHTML = '<div class="swipe-delete-bg"><i class="fas fa-trash-alt"></i></div>' +
+        '<label class="custom-checkbox">' +
+        '<input type="checkbox" ' + checkedAttr + ' onchange="toggleProcure(' + item.id + ', \'' + item.category + '\', this)">' +
+        '<span class="checkmark"></span>' +
+        '</label>' +
+        '<span class="checkbox-item-name">' + escapeHtml(item.name) + '</span>';
+
+    setupSwipeToDelete(itemEl, item);
+    return itemEl;
 }
 
 // ============================================
 // TOGGLE PROCURE (List pages - checkbox)
 // ============================================
-async function toggleProcure(itemId, category, checkbox) {
+function toggleProcure(itemId, category, checkbox) {
+    var item = findCurrentItem(itemId);
+    if (!item) return;
     var wrapper = checkbox.closest('.item-checkbox-wrapper');
 
-    var result = await apiCall('/api/items/' + itemId + '/toggle-procure', 'PUT');
-    if (result && result.success) {
-        if (result.item.to_procure) {
-            wrapper.classList.add('checked');
-            showMiniToast('"' + result.item.name + '" added to procure list');
-        } else {
-            wrapper.classList.remove('checked');
-            showMiniToast('"' + result.item.name + '" removed from procure list');
-        }
+    // Taking an item off the procure list also clears consumed
+    queueItemState(item, { to_procure: checkbox.checked, consumed: checkbox.checked && item.consumed });
+
+    if (item.to_procure) {
+        wrapper.classList.add('checked');
+        showMiniToast('"' + item.name + '" added to procure list');
     } else {
-        checkbox.checked = !checkbox.checked;
+        wrapper.classList.remove('checked');
+        showMiniToast('"' + item.name + '" removed from procure list');
     }
 }
 
@@ -406,20 +777,27 @@ async function deleteItem(itemId, itemName, element) {
     var result = await apiCall('/api/items/' + itemId, 'DELETE');
 
     if (result && result.success) {
-        if (element) {
-            element.remove();
-        }
-
+        itemId = canonicalId(itemId);
+        delete pendingWrites[itemId];
         currentItems = currentItems.filter(function(i) { return i.id !== itemId; });
 
-        var itemsList = document.getElementById('itemsList');
-        var emptyState = document.getElementById('emptyState');
-        if (itemsList && itemsList.children.length === 0) {
-            itemsList.style.display = 'none';
-            if (emptyState) emptyState.style.display = 'flex';
+        if (activeVirtualList) {
+            renderFullList(currentItems);
+        } else {
+            if (element) {
+                element.remove();
+            }
+            var itemsList = document.getElementById('itemsList');
+            if (itemsList && itemsList.children.length === 0) {
+                setListEmpty(true);
+            }
         }
 
-        showUndoToast(result.deleted_id, itemName);
+        if (result.queued) {
+            showMiniToast('"' + itemName + '" will be deleted when you are back online');
+        } else {
+            showUndoToast(result.deleted_id, itemName);
+        }
     }
 }
 
@@ -473,6 +851,16 @@ function filterItems() {
     if (!searchInput) return;
 
     var query = searchInput.value.toLowerCase().trim();
+
+    // Virtualized lists only hold visible rows, so filter the data instead
+    if (activeVirtualList) {
+        var rows = currentItems.filter(function(item) {
+            return item.name.toLowerCase().indexOf(query) !== -1;
+        }).map(function(item) { return { kind: 'item', item: item }; });
+        activeVirtualList.setRows(rows);
+        return;
+    }
+
     var items = document.querySelectorAll('.item-checkbox-wrapper');
 
     items.forEach(function(item) {
@@ -550,6 +938,120 @@ function animateNumber(element, target) {
     }, 30);
 }
 
+// ============================================
+// DASHBOARD TRENDS
+// ============================================
+// Daily procured/consumed counts from the rollup job, all categories
+// summed; the card stays hidden until there is data to show.
+var TREND_DAYS = 14;
+
+async function loadDashboardTrends() {
+    var card = document.getElementById('trendsCard');
+    var chart = document.getElementById('trendsChart');
+    if (!card || !chart) return;
+
+    var trends = await apiCall('/api/dashboard-trends?days=' + TREND_DAYS);
+    if (!Array.isArray(trends)) return;
+
+    var days = trends.map(function(entry) {
+        var day = { label: entry.day.slice(8), procured: 0, consumed: 0 };
+        Object.keys(entry).forEach(function(key) {
+            if (key === 'day') return;
+            day.procured += entry[key].procured;
+            day.consumed += entry[key].consumed;
+        });
+        return day;
+    });
+    var max = days.reduce(function(m, day) {
+        return Math.max(m, day.procured, day.consumed);
+    }, 0);
+    if (max === 0) return;
+
+    var fragment = document.createDocumentFragment();
+    days.forEach(function(day) {
+        var column = document.createElement('div');
+        column.className = 'trend-day';
+        column.title = day.procured + ' procured, ' + day.consumed + ' consumed';
+        var bars = document.createElement('div');
+        bars.className = 'trend-bars';
+        ['procured', 'consumed'].forEach(function(action) {
+            var bar = document.createElement('span');
+            bar.className = 'trend-bar bar-' + action;
+            bar.style.height = Math.round(day[action] / max * 100) + '%';
+            bars.appendChild(bar);
+        });
+        var label = document.createElement('span');
+        label.className = 'trend-label';
+        label.textContent = day.label;
+        column.appendChild(bars);
+        column.appendChild(label);
+        fragment.appendChild(column);
+    });
+    chart.innerHTML = '';
+    chart.appendChild(fragment);
+    card.hidden = false;
+}
+
+// ============================================
+// BACKGROUND REFRESH (service worker cache)
+// ============================================
+// Lists and stats may render from the service worker's cache first; it
+// posts 'api-updated' when revalidation found newer data on the server.
+async function refreshItemList(category) {
+    var items = await apiCall('/api/items/' + category);
+    if (!Array.isArray(items) || hasUnsavedWrites()) return;
+
+    currentItems = items;
+    if (getCurrentPage() === 'procure') {
+        renderProcureList(items);
+    } else {
+        renderFullList(items);
+        filterItems();
+    }
+}
+
+function hasUnsavedWrites() {
+    return writeInFlight || Object.keys(pendingWrites).length > 0;
+}
+
+function refreshCurrentPage() {
+    if (currentCategory) {
+        refreshItemList(currentCategory);
+    } else if (getCurrentPage() === 'dashboard') {
+        refreshDashboardStats();
+    }
+}
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.addEventListener('message', function (event) {
+        var data = event.data || {};
+        if (hasUnsavedWrites()) return;
+
+        // Changes made offline reached the server
+        if (data.type === 'mutations-replayed') {
+            refreshCurrentPage();
+            return;
+        }
+        if (data.type !== 'api-updated') return;
+
+        var match = /^\/api\/items\/([^\/]+)$/.exec(data.url);
+        if (match && match[1] === currentCategory) {
+            refreshItemList(match[1]);
+        } else if (data.url === '/api/dashboard-stats' && getCurrentPage() === 'dashboard') {
+            refreshDashboardStats();
+        }
+    });
+
+    // Ask the service worker to send changes queued while offline
+    var requestReplay = function () {
+        if (navigator.onLine && navigator.serviceWorker.controller) {
+            navigator.serviceWorker.controller.postMessage({ type: 'replay-mutations' });
+        }
+    };
+    window.addEventListener('online', requestReplay);
+    document.addEventListener('DOMContentLoaded', requestReplay);
+}
+
 // ============================================
 // UTILITY FUNCTIONS
 // ============================================
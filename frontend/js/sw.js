@@ -1,22 +1,49 @@
-const CACHE_NAME = 'home-needs-v1.0.0';
+const CACHE_NAME = 'home-needs-v1.2.0';
 const OFFLINE_URL = '/login';
 
+// Cached API reads, one cache per user: home-needs-api-v1-<user key>.
+// Bump the version when the shape of these responses changes.
+const API_CACHE_PREFIX = 'home-needs-api-v1-';
+const CACHEABLE_API = [/^\/api\/items\/[^\/]+$/, /^\/api\/dashboard-stats$/];
+// Visiting these means the user is changing; never show the last user's data
+const PURGE_PATHS = ['/logout', '/login', '/signup'];
+
 const PRECACHE_URLS = [
     '/',
     '/login',
     '/signup',
-    '/static/css/style.css',
     '/static/js/app.js',
     '/manifest.json'
 ];
 
+// Per-page stylesheets written by build_css.py, with the ?v= the pages link
+const CSS_MANIFEST_URL = '/static/css/pages/manifest.json';
+
+function pageStylesheetUrls() {
+    return fetch(CSS_MANIFEST_URL)
+        .then(function(response) {
+            if (!response.ok) throw new Error('CSS manifest ' + response.status);
+            return response.json();
+        })
+        .then(function(manifest) {
+            return Object.keys(manifest.pages).map(function(template) {
+                const entry = manifest.pages[template];
+                return '/static/css/pages/' + entry.deferred + '?v=' + entry.version;
+            });
+        })
+        .catch(function() {
+            // Unbuilt checkout: pages link the full stylesheet instead
+            return ['/static/css/style.css'];
+        });
+}
+
 // Install — cache core assets
 self.addEventListener('install', function(event) {
     event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(function(cache) {
+        Promise.all([caches.open(CACHE_NAME), pageStylesheetUrls()])
+            .then(function(results) {
                 console.log('[SW] Pre-caching core assets');
-                return cache.addAll(PRECACHE_URLS);
+                return results[0].addAll(PRECACHE_URLS.concat(results[1]));
             })
             .then(function() {
                 return self.skipWaiting();
@@ -34,7 +61,9 @@ self.addEventListener('activate', function(event) {
             .then(function(cacheNames) {
                 return Promise.all(
                     cacheNames
-                        .filter(function(name) { return name !== CACHE_NAME; })
+                        .filter(function(name) {
+                            return name !== CACHE_NAME && name.indexOf(API_CACHE_PREFIX) !== 0;
+                        })
                         .map(function(name) {
                             console.log('[SW] Deleting old cache:', name);
                             return caches.delete(name);
@@ -47,17 +76,367 @@ self.addEventListener('activate', function(event) {
     );
 });
 
-// Fetch — network first for API, cache first for assets
+// ============ API READ CACHE ============
+
+function isCacheableApi(url) {
+    return url.origin === self.location.origin && CACHEABLE_API.some(function(pattern) {
+        return pattern.test(url.pathname);
+    });
+}
+
+// Name of the cache holding the signed-in user's reads, if any
+function findUserCache() {
+    return caches.keys().then(function(names) {
+        return names.filter(function(name) {
+            return name.indexOf(API_CACHE_PREFIX) === 0;
+        })[0] || null;
+    });
+}
+
+function purgeApiCaches(keepName) {
+    return caches.keys().then(function(names) {
+        return Promise.all(names
+            .filter(function(name) {
+                return name.indexOf(API_CACHE_PREFIX) === 0 && name !== keepName;
+            })
+            .map(function(name) { return caches.delete(name); }));
+    });
+}
+
+// Store a fresh 200 under the user it belongs to; a new user key means a
+// different account, so the previous user's cache is dropped first
+function storeApiResponse(request, response) {
+    var userKey = response.headers.get('X-User-Key');
+    if (response.status !== 200 || !userKey) {
+        return Promise.resolve();
+    }
+    var cacheName = API_CACHE_PREFIX + userKey;
+    return purgeApiCaches(cacheName)
+        .then(function() { return caches.open(cacheName); })
+        .then(function(cache) { return cache.put(request, response); });
+}
+
+function notifyClients(message) {
+    return self.clients.matchAll({ type: 'window' }).then(function(clients) {
+        clients.forEach(function(client) { client.postMessage(message); });
+    });
+}
+
+// Conditional GET against the cached copy; tells pages when data changed
+function revalidate(request, cached) {
+    var headers = {};
+    var etag = cached && cached.headers.get('ETag');
+    if (etag) {
+        headers['If-None-Match'] = etag;
+    }
+    return fetch(request.url, { headers: headers, credentials: 'same-origin', cache: 'no-store' })
+        .then(function(response) {
+            if (response.status === 304) {
+                return cached;
+            }
+            if (response.status === 401) {
+                return purgeApiCaches(null).then(function() { return response; });
+            }
+            var changed = cached && response.headers.get('ETag') !== etag;
+            return storeApiResponse(request, response.clone()).then(function() {
+                if (changed) {
+                    notifyClients({ type: 'api-updated', url: new URL(request.url).pathname });
+                }
+                return response;
+            });
+        });
+}
+
+// Stale-while-revalidate: answer from the user's cache at once and refresh
+// it in the background; without a cached copy, wait for the network
+function staleWhileRevalidate(event) {
+    var request = event.request;
+    return findUserCache()
+        .then(function(cacheName) {
+            return cacheName ? caches.open(cacheName).then(function(cache) {
+                return cache.match(request);
+            }) : null;
+        })
+        .then(function(cached) {
+            var network = revalidate(request, cached);
+            if (cached) {
+                event.waitUntil(network.catch(function() {}));
+                return cached;
+            }
+            return network;
+        })
+        .catch(function() {
+            return new Response(
+                JSON.stringify({ success: false, message: 'You are offline' }),
+                { headers: { 'Content-Type': 'application/json' } }
+            );
+        });
+}
+
+// Empty the user's cache but keep it, since its name carries the user key
+function clearUserCache() {
+    return findUserCache().then(function(cacheName) {
+        if (!cacheName) return;
+        return caches.open(cacheName).then(function(cache) {
+            return cache.keys().then(function(requests) {
+                return Promise.all(requests.map(function(req) { return cache.delete(req); }));
+            });
+        });
+    });
+}
+
+// ============ OFFLINE MUTATION QUEUE ============
+// Writes that fail for lack of network are stored in IndexedDB as
+// operations with a unique key and replayed in order through
+// POST /api/batch. The server skips keys it has already applied, so a
+// batch whose response was lost can be sent again.
+const QUEUE_DB = 'home-needs-offline';
+const QUEUE_STORE = 'mutations';
+const REPLAY_TAG = 'home-needs-replay';
+const REPLAY_BATCH_SIZE = 50;
+// The server forgets operation keys after 14 days; never replay near that
+const QUEUE_MAX_AGE_MS = 7 * 24 * 60 * 60 * 1000;
+
+function openQueue() {
+    return new Promise(function(resolve, reject) {
+        var open = indexedDB.open(QUEUE_DB, 1);
+        open.onupgradeneeded = function() {
+            open.result.createObjectStore(QUEUE_STORE, { keyPath: 'seq', autoIncrement: true });
+        };
+        open.onsuccess = function() { resolve(open.result); };
+        open.onerror = function() { reject(open.error); };
+    });
+}
+
+// Run work(store) in one transaction; resolves with its request's result
+function withQueue(mode, work) {
+    return openQueue().then(function(db) {
+        return new Promise(function(resolve, reject) {
+            var tx = db.transaction(QUEUE_STORE, mode);
+            var request = work(tx.objectStore(QUEUE_STORE));
+            tx.oncomplete = function() {
+                db.close();
+                resolve(request ? request.result : undefined);
+            };
+            tx.onerror = tx.onabort = function() {
+                db.close();
+                reject(tx.error);
+            };
+        });
+    });
+}
+
+// Translate a failed write into queueable operations, or null when the
+// write cannot be replayed safely (toggles, undo, imports)
+function toOperations(url, method, body) {
+    var match = /^\/api\/items\/(-?\d+)$/.exec(url.pathname);
+    if (method === 'POST' && url.pathname === '/api/items') {
+        return [{ op: 'add', name: body.name, category: body.category }];
+    }
+    if (method === 'PUT' && url.pathname === '/api/items/state' && Array.isArray(body.items)) {
+        return body.items.map(function(state) {
+            return { op: 'state', id: state.id, to_procure: state.to_procure, consumed: !!state.consumed };
+        });
+    }
+    if (method === 'DELETE' && match) {
+        return [{ op: 'delete', id: parseInt(match[1], 10) }];
+    }
+    return null;
+}
+
+function offlineResponse() {
+    return new Response(
+        JSON.stringify({ success: false, message: 'You are offline' }),
+        { status: 503, headers: { 'Content-Type': 'application/json' } }
+    );
+}
+
+function enqueueWrite(request) {
+    var url = new URL(request.url);
+    var bodyRead = request.method === 'DELETE' ? Promise.resolve({}) : request.json();
+    return Promise.all([bodyRead, findUserCache()])
+        .then(function(results) {
+            var ops = toOperations(url, request.method, results[0] || {});
+            // Without a user key the server could not check whose change this is
+            if (!ops || !results[1]) {
+                return offlineResponse();
+            }
+            var userKey = results[1].slice(API_CACHE_PREFIX.length);
+            var now = Date.now();
+            return withQueue('readwrite', function(store) {
+                ops.forEach(function(op) {
+                    op.key = self.crypto.randomUUID();
+                    store.add({ op: op, user_key: userKey, queued_at: now });
+                });
+            }).then(function() {
+                if (self.registration.sync) {
+                    self.registration.sync.register(REPLAY_TAG).catch(function() {});
+                }
+                return new Response(
+                    JSON.stringify({ success: true, queued: true, items: {}, missing: [] }),
+                    { status: 202, headers: { 'Content-Type': 'application/json' } }
+                );
+            });
+        })
+        .catch(function() { return offlineResponse(); });
+}
+
+// Later explicit state for an item replaces earlier queued state, and a
+// delete makes it moot. Returns the entries to send and the seqs to drop.
+function compactQueue(entries) {
+    var cutoff = Date.now() - QUEUE_MAX_AGE_MS;
+    var kept = [];
+    var dropped = [];
+    var lastForItem = {};
+    entries.forEach(function(entry) {
+        var op = entry.op;
+        if (entry.queued_at < cutoff) {
+            dropped.push(entry.seq);
+            return;
+        }
+        var itemKey = entry.user_key + ':' + op.id;
+        if (op.op === 'state' || op.op === 'delete') {
+            var earlier = lastForItem[itemKey];
+            if (earlier !== undefined && kept[earlier].op.op === 'state') {
+                dropped.push(kept[earlier].seq);
+                kept[earlier] = null;
+            }
+            lastForItem[itemKey] = kept.length;
+        }
+        kept.push(entry);
+    });
+    return {
+        kept: kept.filter(function(entry) { return entry !== null; }),
+        dropped: dropped
+    };
+}
+
+// Send consecutive operations of one user at a time, oldest first
+function sendBatches(entries, sent) {
+    if (entries.length === 0) {
+        return Promise.resolve(sent);
+    }
+    var userKey = entries[0].user_key;
+    var batch = [];
+    while (batch.length < entries.length && batch.length < REPLAY_BATCH_SIZE &&
+           entries[batch.length].user_key === userKey) {
+        batch.push(entries[batch.length]);
+    }
+    var rest = entries.slice(batch.length);
+
+    return fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'same-origin',
+        body: JSON.stringify({
+            user_key: userKey,
+            ops: batch.map(function(entry) { return entry.op; })
+        })
+    }).then(function(response) {
+        if (response.status === 403) {
+            // Queued by another account; keep it for when they sign in again
+            return sendBatches(rest, sent);
+        }
+        if (!response.ok) {
+            throw new Error('Replay failed with status ' + response.status);
+        }
+        // Applied, duplicate and rejected operations are all settled
+        return withQueue('readwrite', function(store) {
+            batch.forEach(function(entry) { store.delete(entry.seq); });
+        }).then(function() {
+            return sendBatches(rest, sent + batch.length);
+        });
+    });
+}
+
+var replaying = null;
+
+function replayQueue() {
+    if (replaying) {
+        return replaying;
+    }
+    replaying = withQueue('readonly', function(store) { return store.getAll(); })
+        .then(function(entries) {
+            if (entries.length === 0) {
+                return 0;
+            }
+            var compacted = compactQueue(entries);
+            return withQueue('readwrite', function(store) {
+                compacted.dropped.forEach(function(seq) { store.delete(seq); });
+            }).then(function() {
+                return sendBatches(compacted.kept, 0);
+            });
+        })
+        .then(function(sent) {
+            if (sent > 0) {
+                console.log('[SW] Replayed ' + sent + ' offline changes');
+                return clearUserCache().then(function() {
+                    return notifyClients({ type: 'mutations-replayed' });
+                });
+            }
+        })
+        .finally(function() {
+            replaying = null;
+        });
+    return replaying;
+}
+
+function queueLength() {
+    return withQueue('readonly', function(store) { return store.count(); })
+        .catch(function() { return 0; });
+}
+
+// Writes go out after anything still queued, so the server sees them in
+// order. They make cached reads stale, and are queued when offline.
+function sendWrite(request) {
+    var copy = request.clone();
+    return queueLength()
+        .then(function(count) {
+            return count > 0 ? replayQueue().catch(function() {}) : null;
+        })
+        .then(function() { return fetch(request); })
+        .then(function(response) {
+            if (!response.ok) {
+                return response;
+            }
+            return clearUserCache().then(function() { return response; });
+        }, function() {
+            return enqueueWrite(copy);
+        });
+}
+
+self.addEventListener('sync', function(event) {
+    if (event.tag === REPLAY_TAG) {
+        event.waitUntil(replayQueue());
+    }
+});
+
+// Pages ask for a replay when they come back online
+self.addEventListener('message', function(event) {
+    if (event.data && event.data.type === 'replay-mutations') {
+        event.waitUntil(replayQueue().catch(function() {}));
+    }
+});
+
+// ============ FETCH ============
 self.addEventListener('fetch', function(event) {
     var request = event.request;
     var url = new URL(request.url);
-    
-    // Skip non-GET requests
+
     if (request.method !== 'GET') {
+        if (url.origin === self.location.origin && url.pathname.startsWith('/api/')) {
+            event.respondWith(sendWrite(request));
+        }
         return;
     }
-    
-    // API calls — network only (always fresh data)
+
+    // Item lists and dashboard stats — stale-while-revalidate, per user
+    if (isCacheableApi(url)) {
+        event.respondWith(staleWhileRevalidate(event));
+        return;
+    }
+
+    // Other API calls — network only (always fresh data)
     if (url.pathname.startsWith('/api/')) {
         event.respondWith(
             fetch(request)
@@ -74,8 +453,10 @@ self.addEventListener('fetch', function(event) {
     // Auth routes — network first
     if (url.pathname === '/login' || url.pathname === '/signup' || 
         url.pathname === '/verify' || url.pathname === '/logout') {
+        var purged = PURGE_PATHS.indexOf(url.pathname) !== -1
+            ? purgeApiCaches(null) : Promise.resolve();
         event.respondWith(
-            fetch(request)
+            purged.then(function() { return fetch(request); })
                 .then(function(response) {
                     var responseClone = response.clone();
                     caches.open(CACHE_NAME).then(function(cache) {
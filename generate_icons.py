@@ -1,6 +1,7 @@
 # generate_icons.py
 # Location: Home Needs/generate_icons.py
 # Run: python generate_icons.py
+#      python generate_icons.py --pyramid   (web icons + Android mipmap/splash)
 
 import subprocess
 import sys
@@ -24,6 +25,12 @@ def install_pillow():
 
 def create_home_needs_icon(size, output_path):
     """Create a professional Home Needs app icon"""
+    final = render_home_needs_icon(size)
+    final.save(output_path, 'PNG', optimize=True)
+
+
+def render_home_needs_icon(size):
+    """Draw the Home Needs app icon and return it as an RGBA image"""
     from PIL import Image, ImageDraw, ImageFont
     import math
 
@@ -185,39 +192,188 @@ def create_home_needs_icon(size, output_path):
         fill=(255, 255, 255, 200)
     )
 
-    # Save
     final = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     final.paste(img, (0, 0), img)
-    final.save(output_path, 'PNG', optimize=True)
+    return final
 
 
 def create_adaptive_icon(size, output_path):
     """Create adaptive icon with safe zone for Android"""
-    from PIL import Image, ImageDraw
+    canvas = render_adaptive_icon(size)
+    canvas.save(output_path, 'PNG', optimize=True)
+
+
+def render_adaptive_icon(size):
+    """Draw the adaptive icon (main icon on a padded canvas) in memory"""
+    from PIL import Image
 
     # Adaptive icons need 108dp with 72dp safe zone
     # Add padding around the icon
     padding = int(size * 0.1)
     inner_size = size - (padding * 2)
 
-    # Create the main icon at inner size
-    temp_path = output_path + '.temp.png'
-    create_home_needs_icon(inner_size, temp_path)
-
-    # Place on larger canvas
+    # Place the main icon on a larger canvas
     canvas = Image.new('RGBA', (size, size), (226, 55, 68, 255))
-    inner = Image.open(temp_path)
+    inner = render_home_needs_icon(inner_size)
     canvas.paste(inner, (padding, padding), inner)
-    canvas.save(output_path, 'PNG', optimize=True)
+    return canvas
+
+
+# ============ PYRAMID MODE ============
+# Render one high-resolution master per asset type and derive every
+# size from it by successive downsampling, instead of re-running the
+# drawing routine for each size.
+
+MASTER_SIZE = 2048
+
+WEB_ICON_SIZES = [72, 96, 128, 144, 152, 192, 384, 512]
+
+# Android density buckets and their scale relative to mdpi
+ANDROID_DENSITIES = {
+    'mdpi': 1.0,
+    'hdpi': 1.5,
+    'xhdpi': 2.0,
+    'xxhdpi': 3.0,
+    'xxxhdpi': 4.0,
+}
+
+# Base (mdpi) sizes in dp for each Android asset
+ANDROID_LAUNCHER_DP = 48
+ANDROID_MASKABLE_DP = 82
+ANDROID_SPLASH_DP = 300
+
+
+def downsample_pyramid(master, sizes):
+    """
+    Return {size: image} for every requested size, derived from master.
+
+    Sizes are produced largest first; each level halves the previous one
+    while it is still more than twice the target, then finishes with a
+    single Lanczos resize. Every step works from the last intermediate,
+    so the master is only scanned once.
+    """
+    from PIL import Image
+
+    results = {}
+    current = master
+    for size in sorted(set(sizes), reverse=True):
+        if size > master.width:
+            raise ValueError(
+                f"Size {size} exceeds master size {master.width}")
+        while current.width >= size * 2:
+            half = current.width // 2
+            current = current.resize((half, half), Image.LANCZOS)
+        if current.width == size:
+            results[size] = current.copy()
+        else:
+            results[size] = current.resize((size, size), Image.LANCZOS)
+    return results
+
+
+def get_android_res_dir():
+    """Locate the TWA res/ directory, or None if the Android app is absent"""
+    res_dir = os.path.join('app', 'src', 'main', 'res')
+    if os.path.isdir(res_dir):
+        return res_dir
+    return None
+
+
+def plan_pyramid_outputs(icons_dir, res_dir):
+    """
+    Build the list of outputs as (master_key, size, path) tuples.
+    master_key is 'icon' or 'adaptive'.
+    """
+    outputs = []
+    for size in WEB_ICON_SIZES:
+        outputs.append((
+            'icon', size,
+            os.path.join(icons_dir, f'icon-{size}x{size}.png')))
+    outputs.append((
+        'adaptive', 512,
+        os.path.join(icons_dir, 'icon-adaptive-512x512.png')))
+
+    if res_dir:
+        for density, scale in ANDROID_DENSITIES.items():
+            mipmap_dir = os.path.join(res_dir, f'mipmap-{density}')
+            drawable_dir = os.path.join(res_dir, f'drawable-{density}')
+            outputs.append((
+                'icon', round(ANDROID_LAUNCHER_DP * scale),
+                os.path.join(mipmap_dir, 'ic_launcher.png')))
+            outputs.append((
+                'adaptive', round(ANDROID_MASKABLE_DP * scale),
+                os.path.join(mipmap_dir, 'ic_maskable.png')))
+            outputs.append((
+                'icon', round(ANDROID_SPLASH_DP * scale),
+                os.path.join(drawable_dir, 'splash.png')))
+    return outputs
+
+
+def save_optimized_png(image, output_path):
+    """Write one PNG with optimization and return its size in bytes"""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    image.save(output_path, 'PNG', optimize=True)
+    return os.path.getsize(output_path)
+
+
+def generate_pyramid(icons_dir, res_dir, workers=None):
+    """Render masters once, downsample, and save all outputs in parallel"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    outputs = plan_pyramid_outputs(icons_dir, res_dir)
+
+    masters = {
+        'icon': render_home_needs_icon(MASTER_SIZE),
+        'adaptive': render_adaptive_icon(MASTER_SIZE),
+    }
+
+    images = {}
+    for key, master in masters.items():
+        sizes = [size for k, size, _ in outputs if k == key]
+        images[key] = downsample_pyramid(master, sizes)
+
+    # PNG optimization is the slow part; zlib releases the GIL
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (path, pool.submit(save_optimized_png, images[key][size], path))
+            for key, size, path in outputs
+        ]
+        return [(path, future.result()) for path, future in futures]
+
+
+def main_pyramid():
+    install_pillow()
 
-    # Cleanup temp
-    try:
-        os.remove(temp_path)
-    except Exception:
-        pass
+    icons_dir = os.path.join('frontend', 'icons')
+    if not os.path.exists('frontend'):
+        icons_dir = os.path.join('static', 'icons')
+    os.makedirs(icons_dir, exist_ok=True)
+    res_dir = get_android_res_dir()
+
+    print("=" * 50)
+    print("  🎨 Generating Home Needs Assets (pyramid mode)")
+    print("=" * 50)
+    print(f"  Master size: {MASTER_SIZE}x{MASTER_SIZE}")
+    print(f"  Web icons:   {os.path.abspath(icons_dir)}")
+    if res_dir:
+        print(f"  Android res: {os.path.abspath(res_dir)}")
+    else:
+        print("  Android res: not found — skipping mipmap/splash")
+    print()
+
+    results = generate_pyramid(icons_dir, res_dir)
+    for path, file_size in results:
+        print(f"  ✓ {path:48s} ({file_size / 1024:.1f} KB)")
+
+    print(f"\n{'=' * 50}")
+    print(f"  ✅ {len(results)} assets generated from 2 masters")
+    print(f"{'=' * 50}")
 
 
 def main():
+    if '--pyramid' in sys.argv[1:]:
+        main_pyramid()
+        return
+
     install_pillow()
 
     # Determine icons directory